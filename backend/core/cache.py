@@ -0,0 +1,120 @@
+import threading
+import time
+from collections import OrderedDict, defaultdict
+
+
+class LRUCache:
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self.lock = threading.Lock()
+        self.data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        with self.lock:
+            if key in self.data:
+                self.data.move_to_end(key)
+                self.hits += 1
+                return self.data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value):
+        with self.lock:
+            self.data[key] = value
+            self.data.move_to_end(key)
+            while len(self.data) > self.maxsize:
+                self.data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, predicate):
+        with self.lock:
+            for key in [key for key in self.data if predicate(key)]:
+                del self.data[key]
+
+    def clear(self):
+        with self.lock:
+            self.data.clear()
+
+    def stats(self) -> dict:
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self.data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
+
+
+class TTLCache(LRUCache):
+    # LRU에 만료 시간을 더한 캐시. 만료된 항목은 조회 시점에 지운다
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        super().__init__(maxsize)
+        self.ttl = ttl
+        self.expired = 0
+
+    def get(self, key, default=None):
+        entry = super().get(key)
+        if entry is None:
+            return default
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            with self.lock:
+                self.data.pop(key, None)
+                self.hits -= 1
+                self.misses += 1
+                self.expired += 1
+            return default
+        return value
+
+    def set(self, key, value):
+        super().set(key, (time.monotonic() + self.ttl, value))
+
+    def stats(self) -> dict:
+        stats = super().stats()
+        stats.update({"ttl": self.ttl, "expired": self.expired})
+        return stats
+
+
+# 추천 결과 캐시: (survey_id, user_id, 차단 목록 버전) -> top 6
+recommend_cache = LRUCache(maxsize=1024)
+
+_block_versions = defaultdict(int)
+_block_lock = threading.Lock()
+
+
+def block_version(user_id: int) -> int:
+    return _block_versions[user_id]
+
+
+def bump_block_version(user_id: int):
+    # 이전 버전 키는 더 이상 조회되지 않고 LRU에서 자연히 밀려난다
+    with _block_lock:
+        _block_versions[user_id] += 1
+
+
+def recommend_cache_key(survey_id: int, user_id: int) -> tuple:
+    return (survey_id, user_id, block_version(user_id))
+
+
+def invalidate_survey(survey_id: int):
+    recommend_cache.invalidate(lambda key: key[0] == survey_id)
+
+
+# 검색 결과 캐시: 정규화한 검색 조건 -> 차단 목록 적용 전 페이지
+search_cache = TTLCache(maxsize=512, ttl=60.0)
+
+
+def invalidate_sitters():
+    # 돌보미 한 명이 바뀌어도 모든 설문의 top 6와 검색 결과가 달라질 수 있다
+    recommend_cache.clear()
+    search_cache.clear()
+
+
+def invalidate_search():
+    search_cache.clear()
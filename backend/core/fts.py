@@ -0,0 +1,115 @@
+from sqlalchemy import column, literal_column, table, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+# 돌보미 검색용 FTS5 색인. rowid는 sitter_profiles.id와 같다
+sitter_fts = table("sitter_fts", column("rowid"))
+
+# bm25 컬럼 가중치: name, activities, regions, introduction
+BM25_WEIGHTS = (2.0, 5.0, 5.0, 1.0)
+
+# trigram 색인은 3글자 이상만 찾을 수 있다. 더 짧은 검색어는 태그 사전 부분 일치로 찾는다
+MIN_TERM_LENGTH = 3
+
+_FTS_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS sitter_fts USING fts5(
+        name, activities, regions, introduction, tokenize = 'trigram'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS sitter_fts_ai AFTER INSERT ON sitter_profiles BEGIN
+        INSERT INTO sitter_fts(rowid, name, activities, regions, introduction)
+        VALUES (new.id, (SELECT name FROM "user" WHERE id = new.user_id), new.activities, new.regions, new.introduction);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS sitter_fts_au AFTER UPDATE OF activities, regions, introduction, user_id
+    ON sitter_profiles BEGIN
+        DELETE FROM sitter_fts WHERE rowid = old.id;
+        INSERT INTO sitter_fts(rowid, name, activities, regions, introduction)
+        VALUES (new.id, (SELECT name FROM "user" WHERE id = new.user_id), new.activities, new.regions, new.introduction);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS sitter_fts_ad AFTER DELETE ON sitter_profiles BEGIN
+        DELETE FROM sitter_fts WHERE rowid = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS sitter_fts_user_au AFTER UPDATE OF name ON "user" BEGIN
+        UPDATE sitter_fts SET name = new.name
+        WHERE rowid IN (SELECT id FROM sitter_profiles WHERE user_id = new.id);
+    END
+    """,
+]
+
+_REBUILD_SQL = """
+    INSERT INTO sitter_fts(rowid, name, activities, regions, introduction)
+    SELECT s.id, u.name, s.activities, s.regions, s.introduction
+    FROM sitter_profiles s JOIN "user" u ON u.id = s.user_id
+"""
+
+# 예전 unicode61 색인이나 모든 UPDATE에 반응하던 트리거가 남아 있으면 지우고 다시 만든다
+_FTS_OBJECTS = ["sitter_fts_ai", "sitter_fts_au", "sitter_fts_ad", "sitter_fts_user_au"]
+
+_enabled = None
+
+
+def ensure_sitter_fts(engine: Engine) -> bool:
+    # SQLite가 아니거나 FTS5/trigram(SQLite 3.34+)이 빠진 빌드면 태그 검색으로 대체한다
+    if engine.dialect.name != "sqlite":
+        return False
+    try:
+        with engine.begin() as conn:
+            schema = dict(conn.execute(text(
+                "SELECT name, sql FROM sqlite_master WHERE name IN ('sitter_fts', 'sitter_fts_au')"
+            )).all())
+            exists = "sitter_fts" in schema
+            if exists and ("trigram" not in schema["sitter_fts"] or "UPDATE OF" not in schema.get("sitter_fts_au", "")):
+                for trigger in _FTS_OBJECTS:
+                    conn.execute(text(f"DROP TRIGGER IF EXISTS {trigger}"))
+                conn.execute(text("DROP TABLE sitter_fts"))
+                exists = False
+            for ddl in _FTS_DDL:
+                conn.execute(text(ddl))
+            if not exists:
+                conn.execute(text(_REBUILD_SQL))
+                print("돌보미 FTS5 색인 생성 완료")
+        return True
+    except OperationalError as e:
+        print(f"FTS5 사용 불가, LIKE 검색으로 대체: {e}")
+        return False
+
+
+def fts_enabled(db: Session) -> bool:
+    global _enabled
+    if _enabled is None:
+        bind = db.get_bind()
+        _enabled = bind.dialect.name == "sqlite" and db.execute(text(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sitter_fts'"
+        )).first() is not None
+    return _enabled
+
+
+def split_terms(keyword: str) -> tuple:
+    # (색인으로 찾을 검색어, 너무 짧아 태그 사전에서 찾을 검색어)
+    terms = [term for term in keyword.replace(",", " ").split() if term]
+    return [t for t in terms if len(t) >= MIN_TERM_LENGTH], [t for t in terms if len(t) < MIN_TERM_LENGTH]
+
+
+def build_match_query(terms: list) -> str | None:
+    # trigram 색인이라 각 검색어가 어디에 들어 있어도 찾는다("놀이터" -> 실내놀이터). 검색어끼리는 AND
+    if not terms:
+        return None
+    return " ".join('"' + term.replace('"', '""') + '"' for term in terms)
+
+
+def match_clause(match_query: str):
+    return text("sitter_fts MATCH :fts_query").bindparams(fts_query=match_query)
+
+
+def bm25_rank():
+    weights = ", ".join(str(w) for w in BM25_WEIGHTS)
+    return literal_column(f"bm25(sitter_fts, {weights})")
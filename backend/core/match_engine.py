@@ -0,0 +1,256 @@
+import numpy as np
+from collections import defaultdict, namedtuple
+from sqlalchemy.orm import Session
+from .. import models
+from ..models import tag
+
+WEIGHTS = {
+    "activity": 0.4,
+    "region": 0.3,
+    "pay": 0.1,
+    "pay_period": 0.1,
+    "cctv": 0.1,
+}
+
+# 0~255 각 바이트의 1비트 개수
+POPCOUNT_TABLE = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def split_tokens(value) -> list:
+    # ", "로 이어 붙인 문자열과 리스트를 같은 토큰 목록으로 맞춘다
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.split(",")
+    return [v.strip() for v in value if v and v.strip()]
+
+
+class Vocabulary:
+    def __init__(self):
+        self.index = {}
+
+    def add(self, tokens):
+        for token in tokens:
+            if token not in self.index:
+                self.index[token] = len(self.index)
+
+    @property
+    def n_bytes(self) -> int:
+        return max(1, (len(self.index) + 7) // 8)
+
+    def encode(self, tokens) -> np.ndarray:
+        bits = np.zeros(self.n_bytes * 8, dtype=np.uint8)
+        for token in tokens:
+            pos = self.index.get(token)
+            if pos is not None:
+                bits[pos] = 1
+        return np.packbits(bits)
+
+
+def popcount_rows(masks: np.ndarray) -> np.ndarray:
+    return POPCOUNT_TABLE[masks].sum(axis=-1, dtype=np.int64)
+
+
+def round_scores(raw: np.ndarray) -> np.ndarray:
+    # np.round와 내장 round의 반올림 결과가 다를 수 있어 고유값에만 round를 적용
+    if raw.size == 0:
+        return raw
+    uniques, inverse = np.unique(raw, return_inverse=True)
+    rounded = np.array([round(float(v), 3) for v in uniques], dtype=np.float64)
+    return rounded[inverse.reshape(raw.shape)]
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    # sorted(..., reverse=True)[:k]와 동일한 순서(동점이면 앞선 행 우선)를 보장
+    n = scores.shape[0]
+    if n == 0 or k <= 0:
+        return np.empty(0, dtype=np.int64)
+    if n > k:
+        part = np.argpartition(-scores, k - 1)[:k]
+        kth = scores[part].min()
+        candidates = np.flatnonzero(scores >= kth)
+    else:
+        candidates = np.arange(n)
+    order = np.lexsort((candidates, -scores[candidates]))
+    return candidates[order[:k]]
+
+
+class SitterMatrix:
+    def __init__(self, rows: list):
+        self.activity_vocab = Vocabulary()
+        self.region_vocab = Vocabulary()
+
+        parsed = []
+        for row in rows:
+            activities = split_tokens(row.activities)
+            regions = split_tokens(row.regions)
+            self.activity_vocab.add(activities)
+            self.region_vocab.add(regions)
+            parsed.append((activities, regions, split_tokens(row.pay_periods)))
+
+        n = len(rows)
+        self.size = n
+        self.sitter_ids = np.array([row.id for row in rows], dtype=np.int64)
+        self.user_ids = np.array([row.user_id for row in rows], dtype=np.int64)
+        self.names = [row.name for row in rows]
+        self.hourly_pay = np.array([row.hourly_pay or 0 for row in rows], dtype=np.int64)
+        self.cctv = np.array([_cctv_code(row.cctv_agree) for row in rows], dtype=np.int8)
+        self.pay_periods = [set(periods) for _, _, periods in parsed]
+
+        self.activity_masks = np.zeros((n, self.activity_vocab.n_bytes), dtype=np.uint8)
+        self.region_masks = np.zeros((n, self.region_vocab.n_bytes), dtype=np.uint8)
+        for i, (activities, regions, _) in enumerate(parsed):
+            self.activity_masks[i] = self.activity_vocab.encode(activities)
+            self.region_masks[i] = self.region_vocab.encode(regions)
+        self._dense = None
+
+    @classmethod
+    def from_db(cls, db: Session) -> "SitterMatrix":
+        return cls(load_sitter_rows(db))
+
+    def score(self, user_survey, rows: np.ndarray | None = None) -> np.ndarray:
+        if rows is None:
+            rows = np.arange(self.size)
+
+        user_activities = set(split_tokens(user_survey.activities))
+        user_regions = set(split_tokens(user_survey.hope_regions))
+        activity_query = self.activity_vocab.encode(user_activities)
+        region_query = self.region_vocab.encode(user_regions)
+
+        activity_score = popcount_rows(self.activity_masks[rows] & activity_query) / max(1, len(user_activities))
+        region_score = popcount_rows(self.region_masks[rows] & region_query) / max(1, len(user_regions))
+
+        pay_score = (self.hourly_pay[rows] >= (user_survey.hope_pay or 0)).astype(np.float64)
+
+        pay_period = getattr(user_survey, "pay_period", None)
+        pay_period_score = np.array(
+            [1.0 if pay_period in self.pay_periods[i] else 0.0 for i in rows], dtype=np.float64
+        ) if pay_period else np.zeros(len(rows))
+
+        cctv_score = (self.cctv[rows] == _cctv_code(getattr(user_survey, "cctv_agree", None))).astype(np.float64)
+
+        raw = (
+            WEIGHTS["activity"] * activity_score +
+            WEIGHTS["region"] * region_score +
+            WEIGHTS["pay"] * pay_score +
+            WEIGHTS["pay_period"] * pay_period_score +
+            WEIGHTS["cctv"] * cctv_score
+        )
+        return round_scores(raw)
+
+    def score_many(self, surveys: list) -> np.ndarray:
+        # 설문 x 돌보미 점수 행렬. 겹치는 토큰 수를 비트 행렬 곱 한 번으로 구한다
+        if self._dense is None:
+            self._dense = (
+                np.unpackbits(self.activity_masks, axis=1).astype(np.float32),
+                np.unpackbits(self.region_masks, axis=1).astype(np.float32),
+            )
+        activity_dense, region_dense = self._dense
+
+        user_activities = [set(split_tokens(s.activities)) for s in surveys]
+        user_regions = [set(split_tokens(s.hope_regions)) for s in surveys]
+        activity_query = np.unpackbits(
+            np.array([self.activity_vocab.encode(a) for a in user_activities]).reshape(len(surveys), -1), axis=1
+        ).astype(np.float32)
+        region_query = np.unpackbits(
+            np.array([self.region_vocab.encode(r) for r in user_regions]).reshape(len(surveys), -1), axis=1
+        ).astype(np.float32)
+
+        activity_hits = np.rint(activity_query @ activity_dense.T).astype(np.int64)
+        region_hits = np.rint(region_query @ region_dense.T).astype(np.int64)
+        activity_score = activity_hits / np.array([max(1, len(a)) for a in user_activities])[:, None]
+        region_score = region_hits / np.array([max(1, len(r)) for r in user_regions])[:, None]
+
+        hope_pay = np.array([s.hope_pay or 0 for s in surveys], dtype=np.int64)
+        pay_score = (self.hourly_pay[None, :] >= hope_pay[:, None]).astype(np.float64)
+
+        pay_period_score = np.zeros((len(surveys), self.size))
+        for i, s in enumerate(surveys):
+            pay_period = getattr(s, "pay_period", None)
+            if pay_period:
+                pay_period_score[i] = [1.0 if pay_period in periods else 0.0 for periods in self.pay_periods]
+
+        survey_cctv = np.array([_cctv_code(getattr(s, "cctv_agree", None)) for s in surveys], dtype=np.int8)
+        cctv_score = (self.cctv[None, :] == survey_cctv[:, None]).astype(np.float64)
+
+        raw = (
+            WEIGHTS["activity"] * activity_score +
+            WEIGHTS["region"] * region_score +
+            WEIGHTS["pay"] * pay_score +
+            WEIGHTS["pay_period"] * pay_period_score +
+            WEIGHTS["cctv"] * cctv_score
+        )
+        return round_scores(raw)
+
+    def recommend(self, user_survey, k: int = 6, exclude_user_ids=(), rows: np.ndarray | None = None) -> list:
+        if rows is None:
+            rows = np.arange(self.size)
+        if exclude_user_ids:
+            rows = rows[~np.isin(self.user_ids[rows], list(exclude_user_ids))]
+
+        scores = self.score(user_survey, rows)
+        top = top_k_indices(scores, k)
+        return [self.entry(rows[i], scores[i]) for i in top]
+
+    def entry(self, row: int, score: float) -> dict:
+        return {
+            "sitter_id": int(self.sitter_ids[row]),
+            "name": self.names[row],
+            "score": float(score),
+        }
+
+
+SitterRow = namedtuple("SitterRow", ["id", "user_id", "name", "activities", "regions", "hourly_pay", "pay_periods", "cctv_agree"])
+SurveyRow = namedtuple("SurveyRow", ["id", "user_id", "activities", "hope_regions", "hope_pay"])
+
+
+def load_sitter_rows(db: Session, user_id: int | None = None) -> list:
+    query = db.query(
+        models.SitterProfile.id,
+        models.SitterProfile.user_id,
+        models.User.name,
+        models.SitterProfile.hourly_pay,
+        models.SitterProfile.cctv_agree,
+    ).join(models.User)
+    if user_id is not None:
+        query = query.filter(models.SitterProfile.user_id == user_id)
+    base = query.order_by(models.SitterProfile.id).all()
+
+    sitter_ids = [row.id for row in base] if user_id is not None else None
+    activities = _tag_names(db, tag.sitter_activities.c.sitter_id, tag.sitter_activities.c.activity_id, models.Activity, sitter_ids)
+    regions = _tag_names(db, tag.sitter_regions.c.sitter_id, tag.sitter_regions.c.region_id, models.Region, sitter_ids)
+    pay_periods = _tag_names(db, tag.sitter_pay_periods.c.sitter_id, tag.sitter_pay_periods.c.pay_period_id, models.PayPeriod, sitter_ids)
+
+    return [
+        SitterRow(row.id, row.user_id, row.name, activities[row.id], regions[row.id], row.hourly_pay, pay_periods[row.id], row.cctv_agree)
+        for row in base
+    ]
+
+
+def load_survey_rows(db: Session, survey_ids=None) -> list:
+    query = db.query(models.UserSurvey.id, models.UserSurvey.user_id, models.UserSurvey.hope_pay)
+    if survey_ids is not None:
+        query = query.filter(models.UserSurvey.id.in_(survey_ids))
+    base = query.order_by(models.UserSurvey.id).all()
+
+    ids = [row.id for row in base] if survey_ids is not None else None
+    activities = _tag_names(db, tag.survey_activities.c.survey_id, tag.survey_activities.c.activity_id, models.Activity, ids)
+    regions = _tag_names(db, tag.survey_regions.c.survey_id, tag.survey_regions.c.region_id, models.Region, ids)
+
+    return [SurveyRow(row.id, row.user_id, activities[row.id], regions[row.id], row.hope_pay) for row in base]
+
+
+def _tag_names(db: Session, owner_col, tag_col, tag_model, owner_ids=None) -> dict:
+    query = db.query(owner_col, tag_model.name).join(tag_model, tag_model.id == tag_col)
+    if owner_ids is not None:
+        query = query.filter(owner_col.in_(owner_ids))
+    names = defaultdict(list)
+    for owner_id, name in query:
+        names[owner_id].append(name)
+    return names
+
+
+def _cctv_code(value) -> int:
+    if value is None:
+        return -1
+    return 1 if value else 0
@@ -0,0 +1,92 @@
+import argparse
+import random
+from collections import namedtuple
+from .match_engine import SitterMatrix, SitterRow, SurveyRow, top_k_indices
+from .sitter_index import SitterIndex
+
+# 일괄 채점에서는 쓰지 않지만 calculate_match_score가 읽는 항목까지 채운 설문
+ParitySurvey = namedtuple("ParitySurvey", SurveyRow._fields + ("pay_period", "cctv_agree"))
+
+ACTIVITIES = ["실내놀이", "야외놀이", "숙제지도", "등하원", "영어", "미술"]
+REGIONS = ["강남구", "마포구", "송파구", "서초구"]
+PAY_PERIODS = ["주간", "월간", "일회성"]
+
+
+def random_sitters(rng: random.Random, n: int) -> list:
+    # 시급/지역을 몇 가지 값으로만 뽑아 동점이 자주 나오게 한다
+    return [
+        SitterRow(
+            i + 1, 1000 + i, f"s{i}",
+            rng.sample(ACTIVITIES, rng.randint(0, 3)),
+            rng.sample(REGIONS, rng.randint(0, 2)),
+            rng.choice([None, 9000, 10000, 12000]),
+            rng.sample(PAY_PERIODS, rng.randint(0, 2)),
+            rng.choice([None, True, False]),
+        )
+        for i in range(n)
+    ]
+
+
+def random_survey(rng: random.Random, survey_id: int) -> ParitySurvey:
+    # 4개 중 1개는 어느 돌보미와도 지역이 겹치지 않는 설문
+    regions = ["제주시"] if survey_id % 4 == 0 else rng.sample(REGIONS, rng.randint(0, 2))
+    return ParitySurvey(
+        survey_id, 5000 + survey_id,
+        rng.sample(ACTIVITIES, rng.randint(0, 3)), regions,
+        rng.choice([None, 10000, 12000]),
+        rng.choice([None] + PAY_PERIODS), rng.choice([None, True, False]),
+    )
+
+
+def full_scan(sitters: list, survey, k: int, blocked: set) -> list:
+    # 기존 /match/recommend 방식: 전원 채점 후 안정 정렬로 상위 k명
+    from ..routers.match import calculate_match_score
+    scored = [
+        {"sitter_id": s.id, "name": s.name, "score": calculate_match_score(survey, s)}
+        for s in sitters if s.user_id not in blocked
+    ]
+    return sorted(scored, key=lambda x: x["score"], reverse=True)[:k]
+
+
+def parity_check(trials: int = 200, seed: int = 0) -> int:
+    # 역색인 가지치기(recommend), 행렬 일괄 채점(score_many), 전체 스캔이 순서까지 같은지 무작위로 비교한다.
+    # WEIGHTS나 가지치기 상한을 바꾼 뒤에 돌려 본다
+    rng = random.Random(seed)
+    mismatches = 0
+    for trial in range(trials):
+        sitters = random_sitters(rng, rng.randint(1, 40))
+        surveys = [random_survey(rng, trial * 10 + i) for i in range(rng.randint(1, 6))]
+        k = rng.randint(1, 8)
+
+        index = SitterIndex()
+        for row in sitters:
+            index._add(row)
+        index.loaded = True
+        matrix = SitterMatrix(sitters)
+        batch_scores = matrix.score_many(surveys)
+
+        for survey, row_scores in zip(surveys, batch_scores):
+            blocked = {s.user_id for s in rng.sample(sitters, rng.randint(0, min(3, len(sitters))))}
+            expected = full_scan(sitters, survey, k, blocked)
+
+            rows = [i for i, s in enumerate(sitters) if s.user_id not in blocked]
+            batch = [matrix.entry(rows[i], row_scores[rows[i]]) for i in top_k_indices(row_scores[rows], k)]
+            results = {
+                "sitter_index.recommend": index.recommend(None, survey, k=k, exclude_user_ids=blocked),
+                "SitterMatrix.recommend": matrix.recommend(survey, k=k, exclude_user_ids=blocked),
+                "SitterMatrix.score_many": batch,
+            }
+            for name, result in results.items():
+                if result != expected:
+                    mismatches += 1
+                    print(f"불일치 (trial {trial}, survey {survey.id}, k={k}) {name}:\n  {result}\n  기대값 {expected}")
+    print(f"{trials}회 비교, 불일치 {mismatches}건")
+    return mismatches
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="돌보미 추천 채점 경로 간 결과 일치 확인")
+    parser.add_argument("--trials", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    raise SystemExit(1 if parity_check(args.trials, args.seed) else 0)
@@ -0,0 +1,56 @@
+import argparse
+import json
+import sys
+from collections import defaultdict
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from ..database import SessionLocal
+from .. import models
+from .match_engine import load_survey_rows
+from .sitter_index import sitter_index
+
+
+def blocked_by_owner(db: Session, survey_ids=None) -> dict:
+    # 설문 작성자별 차단 목록. 작성자 본인이 /match/recommend/{survey_id}를 부를 때와 같은 결과가 되도록 적용한다
+    owners = select(models.UserSurvey.user_id)
+    if survey_ids is not None:
+        owners = owners.where(models.UserSurvey.id.in_(survey_ids))
+    blocked = defaultdict(set)
+    for blocker_id, blocked_id in db.query(models.Block.blocker_id, models.Block.blocked_id).filter(
+        models.Block.blocker_id.in_(owners)
+    ):
+        blocked[blocker_id].add(blocked_id)
+    return blocked
+
+
+def recommend_batch(db: Session, survey_ids=None, k: int = 6):
+    # (survey_id, 상위 k명) 목록을 설문 id 순으로 내보낸다
+    surveys = load_survey_rows(db, survey_ids)
+    return sitter_index.recommend_batch(db, surveys, blocked_by_owner(db, survey_ids), k=k)
+
+
+def write_ndjson(output, survey_ids=None, k: int = 6) -> int:
+    db = SessionLocal()
+    written = 0
+    try:
+        for survey_id, matches in recommend_batch(db, survey_ids, k):
+            output.write(json.dumps({"survey_id": survey_id, "matches": matches}, ensure_ascii=False) + "\n")
+            written += 1
+    finally:
+        db.close()
+    return written
+
+
+if __name__ == "__main__":
+    # 운영팀 야간 "추천 돌보미" 메일용 일괄 추천. 전체 설문을 내보내므로 API로 열지 않는다
+    parser = argparse.ArgumentParser(description="설문별 추천 돌보미 상위 k명을 NDJSON으로 출력")
+    parser.add_argument("--survey-ids", type=int, nargs="*", default=None, help="비우면 전체 설문")
+    parser.add_argument("--k", type=int, default=6)
+    parser.add_argument("--output", default=None, help="저장할 파일 (기본: 표준 출력)")
+    args = parser.parse_args()
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            count = write_ndjson(f, args.survey_ids, args.k)
+        print(f"설문 {count}건 추천 결과 저장: {args.output}")
+    else:
+        write_ndjson(sys.stdout, args.survey_ids, args.k)
@@ -0,0 +1,139 @@
+import threading
+import numpy as np
+from collections import defaultdict
+from sqlalchemy.orm import Session
+from .match_engine import SitterMatrix, WEIGHTS, load_sitter_rows, split_tokens, top_k_indices
+
+# 지역/활동이 하나도 겹치지 않는 돌보미가 받을 수 있는 최대 점수
+NO_REGION_BOUND = WEIGHTS["activity"] + WEIGHTS["pay"] + WEIGHTS["pay_period"] + WEIGHTS["cctv"]
+NO_OVERLAP_BOUND = WEIGHTS["pay"] + WEIGHTS["pay_period"] + WEIGHTS["cctv"]
+
+
+class SitterIndex:
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.loaded = False
+        self.rows = {}
+        self.region_postings = defaultdict(set)
+        self.activity_postings = defaultdict(set)
+        self._matrix = None
+        self._positions = {}
+
+    def ensure_loaded(self, db: Session):
+        if self.loaded:
+            return
+        with self.lock:
+            if self.loaded:
+                return
+            for row in load_sitter_rows(db):
+                self._add(row)
+            self.loaded = True
+            print(f"돌보미 역색인 구축 완료: {len(self.rows)}명")
+
+    def refresh_user(self, db: Session, user_id: int):
+        # 회원가입/프로필 수정 후 해당 돌보미 한 명만 다시 색인.
+        # 락 안에서 확인해야, 커밋 전에 행을 읽은 ensure_loaded가 끝난 뒤에도 이번 변경이 반영된다
+        with self.lock:
+            if not self.loaded:
+                return
+            rows = load_sitter_rows(db, user_id=user_id)
+            for sitter_id, row in list(self.rows.items()):
+                if row.user_id == user_id:
+                    self._remove(sitter_id)
+            for row in rows:
+                self._add(row)
+
+    def clear(self):
+        with self.lock:
+            self.loaded = False
+            self.rows.clear()
+            self.region_postings.clear()
+            self.activity_postings.clear()
+            self._matrix = None
+            self._positions = {}
+
+    def _add(self, row):
+        self.rows[row.id] = row
+        for token in split_tokens(row.regions):
+            self.region_postings[token].add(row.id)
+        for token in split_tokens(row.activities):
+            self.activity_postings[token].add(row.id)
+        self._matrix = None
+
+    def _remove(self, sitter_id: int):
+        row = self.rows.pop(sitter_id, None)
+        if row is None:
+            return
+        for token in split_tokens(row.regions):
+            self.region_postings[token].discard(sitter_id)
+        for token in split_tokens(row.activities):
+            self.activity_postings[token].discard(sitter_id)
+        self._matrix = None
+
+    def matrix(self) -> SitterMatrix:
+        with self.lock:
+            if self._matrix is None:
+                ordered = [self.rows[sitter_id] for sitter_id in sorted(self.rows)]
+                self._matrix = SitterMatrix(ordered)
+                self._positions = {row.id: pos for pos, row in enumerate(ordered)}
+            return self._matrix
+
+    def _rows_for(self, postings, tokens) -> set:
+        sitter_ids = set()
+        for token in tokens:
+            sitter_ids |= postings.get(token, set())
+        return {self._positions[sitter_id] for sitter_id in sitter_ids}
+
+    def recommend(self, db: Session, user_survey, k: int = 6, exclude_user_ids=()) -> list:
+        self.ensure_loaded(db)
+        with self.lock:
+            matrix = self.matrix()
+            region_rows = self._rows_for(self.region_postings, split_tokens(user_survey.hope_regions))
+            activity_rows = self._rows_for(self.activity_postings, split_tokens(user_survey.activities)) - region_rows
+
+        excluded = np.isin(matrix.user_ids, list(exclude_user_ids)) if exclude_user_ids else np.zeros(matrix.size, dtype=bool)
+
+        # 상한이 높은 후보군부터 채점하고, 남은 돌보미가 현재 k등을 넘을 수 없으면 중단
+        tiers = [
+            (region_rows, NO_REGION_BOUND if activity_rows else NO_OVERLAP_BOUND),
+            (activity_rows, NO_OVERLAP_BOUND),
+        ]
+        scored_rows = np.empty(0, dtype=np.int64)
+        scores = np.empty(0, dtype=np.float64)
+        for tier_rows, rest_bound in tiers:
+            new_rows = np.array(sorted(tier_rows), dtype=np.int64)
+            new_rows = new_rows[~excluded[new_rows]]
+            scored_rows = np.concatenate([scored_rows, new_rows])
+            scores = np.concatenate([scores, matrix.score(user_survey, new_rows)])
+            if len(scores) >= k and np.partition(-scores, k - 1)[k - 1] < -rest_bound:
+                break
+        else:
+            rest = np.setdiff1d(np.flatnonzero(~excluded), scored_rows, assume_unique=True)
+            scored_rows = np.concatenate([scored_rows, rest])
+            scores = np.concatenate([scores, matrix.score(user_survey, rest)])
+
+        # 전체 스캔과 같은 동점 순서를 위해 행 위치 순으로 정렬 후 top-k
+        order = np.argsort(scored_rows, kind="stable")
+        scored_rows, scores = scored_rows[order], scores[order]
+        return [matrix.entry(scored_rows[i], scores[i]) for i in top_k_indices(scores, k)]
+
+    def recommend_batch(self, db: Session, surveys: list, blocked_by_user: dict, k: int = 6, chunk_size: int = 256):
+        # 요청 시점의 행렬을 고정해 두고, 설문 chunk 단위로 점수 행렬을 만들어 설문별 top-k를 내보낸다
+        self.ensure_loaded(db)
+        matrix = self.matrix()
+        all_rows = np.arange(matrix.size)
+
+        def generate():
+            for start in range(0, len(surveys), chunk_size):
+                chunk = surveys[start:start + chunk_size]
+                scores = matrix.score_many(chunk)
+                for survey, row_scores in zip(chunk, scores):
+                    blocked = blocked_by_user.get(survey.user_id)
+                    rows = all_rows[~np.isin(matrix.user_ids, list(blocked))] if blocked else all_rows
+                    top = top_k_indices(row_scores[rows], k)
+                    yield survey.id, [matrix.entry(rows[i], row_scores[rows[i]]) for i in top]
+
+        return generate()
+
+
+sitter_index = SitterIndex()
@@ -0,0 +1,91 @@
+import os
+from PIL import Image, ImageOps
+from ..database import SessionLocal
+from .. import models
+from ..ml.result_cache import file_content_hash
+from .cache import invalidate_search
+
+# 용도별 최대 너비(px). 목록 카드, 상세 페이지, 크게 보기
+PROFILE_IMAGE_SIZES = {"thumb": 320, "detail": 640, "full": 1280}
+WEBP_QUALITY = 80
+JPEG_QUALITY = 85
+
+
+def profile_image_variant(user, size: str) -> dict | None:
+    # {"webp": 경로, "src": JPEG 경로}. 아직 변환 전이면 원본을 그대로 돌려준다
+    if user is None or not user.profile_image_path:
+        return None
+    variants = user.profile_image_variants or {}
+    if size in variants:
+        return variants[size]
+    return {"webp": None, "src": user.profile_image_path}
+
+
+def render_variants(file_path: str, tag: str) -> dict:
+    # 원본 옆에 크기별 WebP/JPEG를 만든다. 파일 이름에 내용 해시를 넣어 다시 올려도 브라우저 캐시와 섞이지 않는다
+    base = os.path.splitext(file_path)[0]
+    with Image.open(file_path) as image:
+        # JPEG는 디코딩 단계에서 미리 줄여 큰 사진도 빨리 연다
+        largest = max(PROFILE_IMAGE_SIZES.values())
+        image.draft("RGB", (largest, largest * image.height // max(1, image.width)))
+        image = ImageOps.exif_transpose(image)
+        if image.mode in ("RGBA", "LA", "P"):
+            image = image.convert("RGBA")
+            background = Image.new("RGB", image.size, (255, 255, 255))
+            background.paste(image, mask=image.getchannel("A"))
+            image = background
+        else:
+            image = image.convert("RGB")
+
+        variants = {}
+        for size, width in PROFILE_IMAGE_SIZES.items():
+            resized = image
+            if image.width > width:
+                resized = image.resize((width, max(1, round(image.height * width / image.width))), Image.LANCZOS)
+            paths = {"webp": f"{base}_{size}_{tag}.webp", "src": f"{base}_{size}_{tag}.jpg"}
+            _save_atomic(resized, paths["webp"], "WEBP", quality=WEBP_QUALITY, method=4)
+            _save_atomic(resized, paths["src"], "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+            variants[size] = paths
+    return variants
+
+
+def _save_atomic(image: Image.Image, path: str, image_format: str, **options):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    image.save(tmp_path, format=image_format, **options)
+    os.replace(tmp_path, path)
+
+
+def generate_profile_variants(user_id: int, file_path: str, tag: str):
+    # 업로드 응답을 보낸 뒤 백그라운드에서 돈다. 실패하면 원본을 그대로 쓴다.
+    # tag는 업로드한 파일 sha256의 앞부분이다
+    try:
+        variants = render_variants(file_path, tag)
+    except Exception as e:
+        print(f"프로필 사진 변환 실패 (user {user_id}): {e}")
+        return
+
+    discarded = False
+    db = SessionLocal()
+    try:
+        user = db.query(models.User).filter(models.User.id == user_id).first()
+        # 변환하는 동안 다른 사진을 다시 올렸다면(같은 경로에 덮어씀) 이번 결과는 버린다
+        if (user is None or user.profile_image_path != file_path
+                or not os.path.exists(file_path) or not file_content_hash(file_path).startswith(tag)):
+            discarded = True
+        else:
+            user.profile_image_variants = variants
+            db.commit()
+    finally:
+        db.close()
+
+    if discarded:
+        remove_variants(variants)
+    else:
+        invalidate_search()
+
+
+def remove_variants(variants: dict | None):
+    for paths in (variants or {}).values():
+        for path in paths.values():
+            if path and os.path.exists(path):
+                os.remove(path)
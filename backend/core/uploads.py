@@ -0,0 +1,47 @@
+import hashlib
+import os
+import tempfile
+from fastapi import HTTPException, UploadFile
+from starlette.concurrency import run_in_threadpool
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# mkstemp는 0600으로 파일을 만든다. 예전 open(..., "wb")처럼 umask를 따르도록 권한을 맞춘다.
+# umask는 읽으려면 한 번 바꿔야 하므로 import 시점에 한 번만 읽어 둔다
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+async def save_upload(file: UploadFile, file_path: str, max_bytes: int, chunk_size: int = UPLOAD_CHUNK_SIZE) -> dict:
+    # 업로드 파일을 chunk 단위로 임시 파일에 옮겨 쓰면서 크기와 sha256을 함께 계산한다.
+    # 다 쓴 뒤에만 file_path로 rename 하므로, 중간에 실패해도 기존 파일이 반쯤 덮이지 않는다
+    if file.size is not None and file.size > max_bytes:
+        raise _too_large(max_bytes)
+
+    directory = os.path.dirname(file_path) or "."
+    fd, tmp_path = await run_in_threadpool(tempfile.mkstemp, dir=directory, prefix=".upload-")
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as buffer:
+            os.chmod(tmp_path, 0o666 & ~_UMASK)
+            while chunk := await file.read(chunk_size):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise _too_large(max_bytes)
+                digest.update(chunk)
+                await run_in_threadpool(buffer.write, chunk)
+        await run_in_threadpool(os.replace, tmp_path, file_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    return {"file_path": file_path, "size": size, "sha256": digest.hexdigest()}
+
+
+def _too_large(max_bytes: int) -> HTTPException:
+    return HTTPException(
+        status_code=413,
+        detail=f"파일이 너무 큽니다. (최대 {max_bytes // (1024 * 1024)}MB)"
+    )
@@ -1 +1,2 @@
-from .user_crud import *
\ No newline at end of file
+from .user_crud import *
+from .tag_crud import *
\ No newline at end of file
@@ -0,0 +1,47 @@
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from .. import models
+from ..core.match_engine import split_tokens
+
+
+def get_or_create_tags(db: Session, model, names) -> list:
+    names = list(dict.fromkeys(split_tokens(names)))
+    if not names:
+        return []
+
+    existing = {tag.name: tag for tag in db.query(model).filter(model.name.in_(names))}
+    for name in names:
+        if name in existing:
+            continue
+        try:
+            with db.begin_nested():
+                tag = model(name=name)
+                db.add(tag)
+            existing[name] = tag
+        except IntegrityError:
+            # 동시에 같은 태그가 만들어진 경우
+            existing[name] = db.query(model).filter(model.name == name).one()
+
+    return [existing[name] for name in names]
+
+
+def set_sitter_tags(db: Session, profile, activities=None, regions=None, pay_periods=None):
+    # 연결 테이블이 기준이고, 문자열 컬럼은 화면 표시용 사본으로 함께 맞춰 둔다
+    if activities is not None:
+        profile.activity_tags = get_or_create_tags(db, models.Activity, activities)
+        profile.activities = ", ".join(tag.name for tag in profile.activity_tags) or None
+    if regions is not None:
+        profile.region_tags = get_or_create_tags(db, models.Region, regions)
+        profile.regions = ", ".join(tag.name for tag in profile.region_tags) or None
+    if pay_periods is not None:
+        profile.pay_period_tags = get_or_create_tags(db, models.PayPeriod, pay_periods)
+        profile.pay_periods = ", ".join(tag.name for tag in profile.pay_period_tags) or None
+
+
+def set_survey_tags(db: Session, survey, activities=None, hope_regions=None):
+    if activities is not None:
+        survey.activity_tags = get_or_create_tags(db, models.Activity, activities)
+        survey.activities = ", ".join(tag.name for tag in survey.activity_tags) or None
+    if hope_regions is not None:
+        survey.region_tags = get_or_create_tags(db, models.Region, hope_regions)
+        survey.hope_regions = ", ".join(tag.name for tag in survey.region_tags) or None
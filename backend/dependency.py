@@ -1,18 +1,92 @@
+import threading
+import time
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from .database import SessionLocal
 from . import models
 from .core.security import SECRET_KEY, ALGORITHM, get_current_user
-from .ml.document import ChildcareDocumentClassifier
 
 state = {} 
 
-def get_verifier() -> ChildcareDocumentClassifier:
-    if "verifier" not in state:
-        raise RuntimeError("Document Verifier model not initialized.")
-    return state["verifier"]
+
+def load_verifier():
+    # torch/transformers/easyocr은 여기서 처음 import 되므로 ML이 필요 없는 API는 바로 뜬다
+    from .ml.document import ChildcareDocumentClassifier
+    from .ml.result_cache import verification_cache
+    verifier = ChildcareDocumentClassifier(similarity_threshold=0.70)
+    verification_cache.purge_other_versions(verifier.version(base_threshold=0.70))
+    return verifier
+
+
+def load_rematch_model():
+    from .ml import model_load
+    model = model_load.load_prediction_model()
+    if model is None:
+        raise RuntimeError(model_load.MODEL_LOAD_ERROR or "재매칭 확률 모델을 불러오지 못했습니다.")
+    return model
+
+
+MODEL_LOADERS = {
+    "verifier": load_verifier,
+    "rematch_model": load_rematch_model,
+}
+
+# 없어도 서비스가 돌아가는 모델. 재매칭 확률은 모델이 없으면 기본값(100.0)을 쓴다
+OPTIONAL_MODELS = {"rematch_model"}
+
+model_status = {
+    name: {"status": "pending", "error": None, "load_seconds": None, "optional": name in OPTIONAL_MODELS}
+    for name in MODEL_LOADERS
+}
+_model_locks = {name: threading.Lock() for name in MODEL_LOADERS}
+
+
+def ensure_model(name: str):
+    with _model_locks[name]:
+        if model_status[name]["status"] == "ready":
+            return state[name]
+        model_status[name].update(status="loading", error=None)
+        started = time.monotonic()
+        try:
+            state[name] = MODEL_LOADERS[name]()
+        except Exception as e:
+            model_status[name].update(status="failed", error=str(e))
+            raise
+        model_status[name].update(status="ready", load_seconds=round(time.monotonic() - started, 2))
+        print(f"{name} 모델 준비 완료 ({model_status[name]['load_seconds']}초)")
+        return state[name]
+
+
+async def warm_up_models():
+    # 서버가 요청을 받기 시작한 뒤 백그라운드에서 모델을 하나씩 올린다
+    for name in MODEL_LOADERS:
+        try:
+            await run_in_threadpool(ensure_model, name)
+        except Exception as e:
+            print(f"{name} 모델 로딩 실패: {e}")
+
+
+def models_ready() -> bool:
+    return all(info["status"] == "ready" for name, info in model_status.items() if name not in OPTIONAL_MODELS)
+
+
+def get_verifier():
+    if model_status["verifier"]["status"] == "loading":
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="문서 검증 모델을 준비 중입니다. 잠시 후 다시 시도해주세요.",
+            headers={"Retry-After": "15"}
+        )
+    try:
+        return ensure_model("verifier")
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="문서 검증 모델을 불러오지 못했습니다."
+        )
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/token", auto_error=False)
 
@@ -1,20 +1,32 @@
+import asyncio
+import os
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
 from fastapi.middleware.cors import CORSMiddleware
-from .database import Base, engine
 from .routers import auth, certificate, profile_image, match, search, reviews, user_update, report, chating
-from .ml import model_load
-from .ml.document import ChildcareDocumentClassifier
 from . import dependency
+from sqlalchemy import text
+from .database import engine
+from .migrations import run_migrations
+from .ml.jobs import verification_jobs
 
-Base.metadata.create_all(bind=engine)
+run_migrations()
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    dependency.state["verifier"] = ChildcareDocumentClassifier(similarity_threshold=0.70)
-    print("FastAPI Lifespan: 문서 검증 모델 로딩 완료")
+    # 모델은 백그라운드에서 올린다. MODEL_WARMUP=0이면 처음 필요할 때 올린다
+    warmup = None
+    if os.environ.get("MODEL_WARMUP", "1") != "0":
+        warmup = asyncio.create_task(dependency.warm_up_models())
     yield
+    if warmup is not None:
+        warmup.cancel()
+    if "verifier" in dependency.state:
+        saved = dependency.state["verifier"].save_embedding_cache()
+        print(f"문장 임베딩 캐시 {saved}개 저장")
+    verification_jobs.shutdown()
 
 app = FastAPI(title="아이돌봄 매칭 서비스", lifespan=lifespan)
 
@@ -35,4 +47,25 @@ app.include_router(search.router, prefix="/api")
 app.include_router(reviews.router, prefix="/api") 
 app.include_router(user_update.router, prefix="/api")
 app.include_router(report.router, prefix="/api")
-app.include_router(chating.router, prefix="/chat")
\ No newline at end of file
+app.include_router(chating.router, prefix="/chat")
+
+
+@app.get("/health/ready")
+def health_ready():
+    # 인증/검색 등 대부분의 API는 모델 없이 동작하므로 HTTP 상태는 DB 연결만 본다.
+    # ML 준비 상태는 ml_ready와 모델별 status로 따로 알려준다 (검증 API는 준비 전까지 503)
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        database_ok, database_error = True, None
+    except Exception as e:
+        database_ok, database_error = False, str(e)
+    return JSONResponse(
+        status_code=200 if database_ok else 503,
+        content={
+            "ready": database_ok,
+            "database": {"ok": database_ok, "error": database_error},
+            "ml_ready": dependency.models_ready(),
+            "models": dependency.model_status
+        }
+    )
\ No newline at end of file
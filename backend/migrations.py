@@ -0,0 +1,83 @@
+from sqlalchemy import exists, inspect, or_, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from .database import Base, engine, SessionLocal
+from . import models, crud
+from .core.fts import ensure_sitter_fts
+from .models import tag
+
+
+# create_all은 이미 있는 테이블에 컬럼을 더하지 않으므로, 나중에 모델에 추가한 컬럼은 여기서 붙인다
+ADDED_COLUMNS = [
+    ("user", "profile_image_variants", "JSON"),
+]
+
+
+def add_missing_columns(engine: Engine) -> list:
+    added = []
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table, column, column_type in ADDED_COLUMNS:
+            if column not in {c["name"] for c in inspector.get_columns(table)}:
+                conn.execute(text(f'ALTER TABLE "{table}" ADD COLUMN {column} {column_type}'))
+                added.append(f"{table}.{column}")
+    return added
+
+
+def backfill_tags(db: Session, batch_size: int = 500) -> int:
+    # ", "로 저장된 기존 문자열 컬럼을 연결 테이블로 옮긴다. 이미 옮긴 행은 건너뛰므로 여러 번 실행해도 된다
+    migrated = 0
+
+    sitter_filter = [
+        or_(models.SitterProfile.activities.isnot(None), models.SitterProfile.regions.isnot(None),
+            models.SitterProfile.pay_periods.isnot(None)),
+        ~exists().where(tag.sitter_activities.c.sitter_id == models.SitterProfile.id),
+        ~exists().where(tag.sitter_regions.c.sitter_id == models.SitterProfile.id),
+        ~exists().where(tag.sitter_pay_periods.c.sitter_id == models.SitterProfile.id),
+    ]
+    for profile in _in_batches(db, models.SitterProfile, sitter_filter, batch_size):
+        crud.set_sitter_tags(db, profile, activities=profile.activities or [],
+                             regions=profile.regions or [], pay_periods=profile.pay_periods or [])
+        migrated += 1
+
+    survey_filter = [
+        or_(models.UserSurvey.activities.isnot(None), models.UserSurvey.hope_regions.isnot(None)),
+        ~exists().where(tag.survey_activities.c.survey_id == models.UserSurvey.id),
+        ~exists().where(tag.survey_regions.c.survey_id == models.UserSurvey.id),
+    ]
+    for survey in _in_batches(db, models.UserSurvey, survey_filter, batch_size):
+        crud.set_survey_tags(db, survey, activities=survey.activities or [], hope_regions=survey.hope_regions or [])
+        migrated += 1
+
+    return migrated
+
+
+def _in_batches(db: Session, model, filters: list, batch_size: int):
+    # id 순으로 batch_size개씩 읽고, 한 batch가 끝날 때마다 commit 한다
+    last_id = 0
+    while True:
+        rows = db.query(model).filter(model.id > last_id, *filters).order_by(model.id).limit(batch_size).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+        yield from rows
+        db.commit()
+
+
+def run_migrations():
+    Base.metadata.create_all(bind=engine)
+    added = add_missing_columns(engine)
+    if added:
+        print(f"컬럼 추가 완료: {', '.join(added)}")
+    ensure_sitter_fts(engine)
+    db = SessionLocal()
+    try:
+        migrated = backfill_tags(db)
+        if migrated:
+            print(f"태그 연결 테이블 backfill 완료: {migrated}건")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    run_migrations()
@@ -0,0 +1,105 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+class EncodeBatcher:
+    # 동시에 들어온 요청의 문장을 잠깐 모았다가 한 번의 forward로 인코딩하고, 결과를 요청별로 나눠 돌려준다.
+    # encode_fn은 (임베딩, 배치 정보 dict)를 돌려주고, 정보의 token_counts(문장별 토큰 수)는 요청별로 잘라 합친다
+    def __init__(self, encode_fn, max_batch_size: int = 64, max_wait_ms: float = 5.0):
+        self.encode_fn = encode_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.queue = queue.Queue()
+        self.lock = threading.Lock()
+        self.thread = None
+
+        self.requests = 0
+        self.batches = 0
+        self.sentences = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.encode_total = 0.0
+
+    def encode(self, sentences: list) -> tuple:
+        # (임베딩, 이 요청이 속한 배치의 정보)
+        return self.submit(sentences).result()
+
+    def submit(self, sentences: list) -> Future:
+        self._ensure_started()
+        future = Future()
+        self.queue.put((list(sentences), future, time.monotonic()))
+        return future
+
+    def _ensure_started(self):
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._run, name="encode-batcher", daemon=True)
+                self.thread.start()
+
+    def _collect(self) -> list:
+        pending = [self.queue.get()]
+        count = len(pending[0][0])
+        deadline = time.monotonic() + self.max_wait
+        while count < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self.queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            pending.append(item)
+            count += len(item[0])
+        return pending
+
+    def _run(self):
+        while True:
+            pending = self._collect()
+            started = time.monotonic()
+            sentences = [s for item in pending for s in item[0]]
+            try:
+                embeddings, info = self.encode_fn(sentences)
+            except Exception as e:
+                for _, future, _ in pending:
+                    future.set_exception(e)
+                continue
+            elapsed = time.monotonic() - started
+
+            token_counts = info.pop("token_counts", None)
+            offset = 0
+            for item_sentences, future, enqueued_at in pending:
+                item_info = dict(info, batch_sentences=len(sentences),
+                                 queue_wait_ms=round((started - enqueued_at) * 1000, 2))
+                if token_counts is not None:
+                    item_info["tokens"] = sum(token_counts[offset: offset + len(item_sentences)])
+                future.set_result((embeddings[offset: offset + len(item_sentences)], item_info))
+                offset += len(item_sentences)
+
+            with self.lock:
+                self.requests += len(pending)
+                self.batches += 1
+                self.sentences += len(sentences)
+                self.encode_total += elapsed
+                for _, _, enqueued_at in pending:
+                    wait = started - enqueued_at
+                    self.wait_total += wait
+                    self.wait_max = max(self.wait_max, wait)
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": round(self.max_wait * 1000, 2),
+                "queued": self.queue.qsize(),
+                "requests": self.requests,
+                "batches": self.batches,
+                "sentences": self.sentences,
+                "avg_requests_per_batch": round(self.requests / self.batches, 2) if self.batches else 0.0,
+                "avg_sentences_per_batch": round(self.sentences / self.batches, 2) if self.batches else 0.0,
+                "avg_queue_wait_ms": round(self.wait_total / self.requests * 1000, 2) if self.requests else 0.0,
+                "max_queue_wait_ms": round(self.wait_max * 1000, 2),
+                "avg_encode_ms": round(self.encode_total / self.batches * 1000, 2) if self.batches else 0.0,
+                "sentences_per_sec": round(self.sentences / self.encode_total, 2) if self.encode_total else 0.0,
+            }
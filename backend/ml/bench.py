@@ -0,0 +1,284 @@
+import argparse
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import numpy as np
+import fitz
+from PIL import Image
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# 합성 증명서 문안. (이름, 언어, 증명서 여부, 줄 목록)
+TEMPLATES = [
+    ("ko_childcare", "ko", True, [
+        "자격증",
+        "제 2020-123456 호",
+        "성명: 홍길동",
+        "생년월일: 1990년 1월 1일",
+        "위 사람은 영유아보육법 제22조에 따라",
+        "보육교사 2급 자격을 취득하였음을 증명합니다.",
+        "2020년 3월 2일",
+        "보건복지부장관",
+    ]),
+    ("ko_other", "ko", False, [
+        "주민등록표 등본",
+        "이 등본은 세대별 주민등록표의 원본 내용과 틀림없음을 증명합니다.",
+        "세대주 성명: 홍길동",
+        "주소: 서울특별시 강남구 테헤란로 1",
+        "발급일: 2024년 5월 1일",
+    ]),
+    ("en_childcare", "en", True, [
+        "Childcare Teacher Certificate",
+        "Certificate No. 2020-123456",
+        "Name: Gildong Hong",
+        "This certifies that the holder is qualified as a childcare teacher (level 2)",
+        "under the Infant Care Act.",
+        "Minister of Health and Welfare",
+    ]),
+    ("en_other", "en", False, [
+        "Receipt",
+        "Item: Children's picture books x 3",
+        "Total: 36,000 KRW",
+        "Thank you for your purchase.",
+    ]),
+]
+
+PHOTO_LONG_EDGES = [1024, 2048, 4032]
+
+
+def text_pdf(lines: list) -> bytes:
+    doc = fitz.open()
+    page = doc.new_page(width=595, height=842)
+    for i, line in enumerate(lines):
+        page.insert_text((60, 120 + i * 36), line, fontname="korea", fontsize=14)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def page_image(pdf_bytes: bytes, dpi: int) -> Image.Image:
+    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+    pix = doc[0].get_pixmap(dpi=dpi)
+    image = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+    doc.close()
+    return image
+
+
+def scanned_pdf(pdf_bytes: bytes, dpi: int = 150) -> bytes:
+    # 텍스트 레이어 없이 이미지 한 장만 들어 있는 PDF
+    buffer = io.BytesIO()
+    page_image(pdf_bytes, dpi).save(buffer, format="JPEG", quality=85)
+    doc = fitz.open()
+    page = doc.new_page(width=595, height=842)
+    page.insert_image(page.rect, stream=buffer.getvalue())
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def photo_jpeg(pdf_bytes: bytes, long_edge: int, seed: int) -> bytes:
+    # 책상 위에서 찍은 사진처럼 어두운 배경에 살짝 기울어진 종이를 놓고 잡음을 더한다
+    rng = np.random.default_rng(seed)
+    paper = page_image(pdf_bytes, 200).rotate(float(rng.uniform(-3, 3)), expand=True, fillcolor=(70, 60, 50))
+    canvas_size = (int(paper.width * 1.3), int(paper.height * 1.2))
+    canvas = Image.new("RGB", canvas_size, (70, 60, 50))
+    canvas.paste(paper, ((canvas_size[0] - paper.width) // 2, (canvas_size[1] - paper.height) // 2))
+    pixels = np.asarray(canvas, dtype=np.int16) + rng.normal(0, 6, (canvas.height, canvas.width, 1)).astype(np.int16)
+    canvas = Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8))
+    scale = long_edge / max(canvas.size)
+    canvas = canvas.resize((round(canvas.width * scale), round(canvas.height * scale)), Image.LANCZOS)
+    buffer = io.BytesIO()
+    canvas.save(buffer, format="JPEG", quality=85)
+    return buffer.getvalue()
+
+
+def generate_corpus(directory: str) -> list:
+    samples = []
+    for seed, (name, lang, expected, lines) in enumerate(TEMPLATES):
+        pdf_bytes = text_pdf(lines)
+        variants = [(f"{name}_text.pdf", "text_pdf", pdf_bytes), (f"{name}_scan.pdf", "scanned_pdf", scanned_pdf(pdf_bytes))]
+        variants += [
+            (f"{name}_photo_{edge}.jpg", f"photo_{edge}", photo_jpeg(pdf_bytes, edge, seed))
+            for edge in PHOTO_LONG_EDGES
+        ]
+        for filename, kind, data in variants:
+            path = os.path.join(directory, filename)
+            with open(path, "wb") as f:
+                f.write(data)
+            samples.append({"path": path, "kind": kind, "lang": lang, "expected": expected})
+    return samples
+
+
+def current_rss_mb() -> float | None:
+    # 지금 시점의 RSS. /proc이 없는 OS(macOS, Windows)에서는 None
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return round(resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024), 1)
+
+
+def peak_rss_mb() -> float | None:
+    # 프로세스 시작 후 최고치(high-water mark). 줄어들지 않으므로 단계별 비교에는 current_rss_mb를 쓴다
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS는 바이트, Linux는 KB 단위
+    return round(peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024, 1)
+
+
+def percentile(values: list, q: float) -> float:
+    return round(float(np.percentile(values, q)), 2) if values else 0.0
+
+
+def summarize(runs: list, wall_seconds: float) -> dict:
+    latencies = [run["latency_ms"] for run in runs]
+    stages = sorted({stage for run in runs for stage in run["timings"] if stage.endswith("_ms")})
+    return {
+        "docs": len(runs),
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "docs_per_sec": round(len(runs) / wall_seconds, 3) if wall_seconds else 0.0,
+        "accuracy": round(sum(run["correct"] for run in runs) / len(runs), 4) if runs else 0.0,
+        "stages": {
+            stage[:-3]: {
+                "p50_ms": percentile([run["timings"][stage] for run in runs if stage in run["timings"]], 50),
+                "p95_ms": percentile([run["timings"][stage] for run in runs if stage in run["timings"]], 95),
+            }
+            for stage in stages
+        },
+    }
+
+
+def verify(verifier, sample: dict) -> dict:
+    started = time.perf_counter()
+    result = verifier.classify_with_rules(file_path=sample["path"], base_threshold=0.70)
+    return {
+        "kind": sample["kind"],
+        "lang": sample["lang"],
+        "latency_ms": (time.perf_counter() - started) * 1000,
+        "timings": result.get("timings", {}),
+        "correct": bool(result["verdict"]) == sample["expected"],
+    }
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(output: str, concurrency: int = 4, repeat: int = 1, warm_cache: bool = False, backend: str | None = None) -> dict:
+    from .document import ChildcareDocumentClassifier
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "concurrency": concurrency,
+            "repeat": repeat,
+            "warm_cache": warm_cache,
+        },
+        "rss_mb": {"start": current_rss_mb()},
+    }
+
+    with tempfile.TemporaryDirectory() as directory:
+        samples = generate_corpus(directory)
+        report["rss_mb"]["corpus"] = current_rss_mb()
+
+        started = time.perf_counter()
+        options = {"backend": backend} if backend else {}
+        # 캐시 효과를 빼고 재려면 문장 임베딩 캐시를 끈다
+        verifier = ChildcareDocumentClassifier(
+            similarity_threshold=0.70, cache_dir=None, embedding_cache_mb=64 if warm_cache else 0, **options
+        )
+        report["meta"]["backend"] = verifier.backend
+        report["model_load_seconds"] = round(time.perf_counter() - started, 2)
+        report["rss_mb"]["model_load"] = current_rss_mb()
+
+        # 첫 호출의 지연(스레드 풀, 커널 초기화)이 결과에 섞이지 않게 한 번 돌려 둔다
+        verify(verifier, samples[0])
+
+        serial_runs = []
+        started = time.perf_counter()
+        for _ in range(repeat):
+            serial_runs += [verify(verifier, sample) for sample in samples]
+        serial_wall = time.perf_counter() - started
+        report["rss_mb"]["serial"] = current_rss_mb()
+
+        concurrent_runs = []
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for _ in range(repeat):
+                concurrent_runs += list(pool.map(lambda sample: verify(verifier, sample), samples))
+        concurrent_wall = time.perf_counter() - started
+        report["rss_mb"]["concurrent"] = current_rss_mb()
+        report["peak_rss_mb"] = peak_rss_mb()
+
+    kinds = sorted({run["kind"] for run in serial_runs})
+    report["serial"] = {
+        "overall": summarize(serial_runs, serial_wall),
+        "by_kind": {
+            kind: summarize([r for r in serial_runs if r["kind"] == kind],
+                            sum(r["latency_ms"] for r in serial_runs if r["kind"] == kind) / 1000)
+            for kind in kinds
+        },
+    }
+    report["concurrent"] = {"overall": summarize(concurrent_runs, concurrent_wall)}
+    report["encode_batcher"] = verifier.batcher.stats()
+
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    serial, concurrent = report["serial"]["overall"], report["concurrent"]["overall"]
+    print(f"직렬: p50 {serial['p50_ms']}ms, p95 {serial['p95_ms']}ms, {serial['docs_per_sec']}건/초, 정확도 {serial['accuracy']}")
+    print(f"동시({concurrency}): p50 {concurrent['p50_ms']}ms, p95 {concurrent['p95_ms']}ms, {concurrent['docs_per_sec']}건/초")
+    print(f"단계별 RSS: {report['rss_mb']}MB, 최대 RSS: {report['peak_rss_mb']}MB -> {output}")
+    return report
+
+
+def compare(before_path: str, after_path: str):
+    # 두 실행 결과의 주요 수치를 나란히 보여준다
+    with open(before_path, encoding="utf-8") as f:
+        before = json.load(f)
+    with open(after_path, encoding="utf-8") as f:
+        after = json.load(f)
+    print(f"{before['meta'].get('commit')} -> {after['meta'].get('commit')}")
+    for mode in ("serial", "concurrent"):
+        for key in ("p50_ms", "p95_ms", "docs_per_sec", "accuracy"):
+            old, new = before[mode]["overall"][key], after[mode]["overall"][key]
+            change = f"{(new - old) / old * 100:+.1f}%" if old else "-"
+            print(f"{mode:>10} {key:>12}: {old:>10} -> {new:>10} ({change})")
+    for stage in ("model_load", "concurrent"):
+        old, new = before.get("rss_mb", {}).get(stage), after.get("rss_mb", {}).get(stage)
+        print(f"{'rss_mb':>10} {stage:>12}: {old!s:>10} -> {new!s:>10}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="증명서 검증 처리량 벤치마크 (합성 문서 사용)")
+    parser.add_argument("--output", default="bench_result.json")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--warm-cache", action="store_true", help="문장 임베딩 캐시를 켠 채로 잰다")
+    parser.add_argument("--backend", default=None, help="torch / int8 / onnx (기본: MPNET_BACKEND)")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"), help="저장된 두 결과 비교")
+    args = parser.parse_args()
+    if args.compare:
+        compare(*args.compare)
+    else:
+        run(args.output, args.concurrency, args.repeat, args.warm_cache, args.backend)
@@ -1,4 +1,5 @@
 import re
+import hashlib
 import numpy as np
 import torch
 from PIL import Image
@@ -8,85 +9,252 @@ import warnings
 import fitz
 import pickle
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from .batcher import EncodeBatcher
+from .encoders import build_encoder, ENCODE_BATCH_SIZE
+from .verifier_config import (
+    MPNET_MODEL_NAME, MPNET_BACKEND, KEYWORDS, REFERENCES, STRONG_EVIDENCE, verifier_version
+)
+from .preprocess import DEFAULT_PREPROCESS, preprocess_image, render_dpi
+from .keywords import KeywordMatcher
+from .embedding_cache import EmbeddingCache, normalize_sentence
+from .metrics import stage_metrics
 
 warnings.filterwarnings('ignore')
 
+# PDF는 앞쪽 몇 쪽만 본다. 텍스트 레이어가 없으면 렌더링해 OCR (전처리를 끄면 OCR_DPI 고정)
+PDF_MAX_PAGES = 3
+OCR_DPI = 150
+
+# 참조 문장 임베딩을 모델 캐시 옆에 저장해 재시작 시 다시 계산하지 않는다
+DEFAULT_CACHE_DIR = os.path.join(
+    os.environ.get("HF_HOME", os.path.join(os.path.expanduser("~"), ".cache", "huggingface")),
+    "childcare_verifier"
+)
+
 class ChildcareDocumentClassifier:
-    def __init__(self, similarity_threshold: float = 0.70):
+    KEYWORDS = KEYWORDS
+    REFERENCES = REFERENCES
+    STRONG_EVIDENCE = STRONG_EVIDENCE
+    SHORT_CIRCUIT_SCORE = 1.0
+
+    def __init__(self, similarity_threshold: float = 0.70, cache_dir: str | None = DEFAULT_CACHE_DIR,
+                 batch_size: int = 64, batch_wait_ms: float = 5.0, backend: str = MPNET_BACKEND,
+                 ocr_workers: int = 2, early_exit: bool = True, preprocess: dict | None = None,
+                 short_circuit: bool = True, encode_batch_size: int = ENCODE_BATCH_SIZE,
+                 embedding_cache_mb: int = 64, persist_top: int = 5000):
         print("MPNet 모델 및 OCR 리더 로딩 중")
-        self.mpnet_tokenizer = AutoTokenizer.from_pretrained("sentence-transformers/all-mpnet-base-v2")
-        self.mpnet_model = AutoModel.from_pretrained("sentence-transformers/all-mpnet-base-v2")
+        self.mpnet_tokenizer = AutoTokenizer.from_pretrained(MPNET_MODEL_NAME)
+        self.mpnet_model = AutoModel.from_pretrained(MPNET_MODEL_NAME)
         self.mpnet_model.eval()
+        self.backend = backend
+        self.encoder = build_encoder(backend, self.mpnet_tokenizer, self.mpnet_model, cache_dir, encode_batch_size)
+        # 양자화/ONNX 백엔드를 쓰면 원본 fp32 모델은 더 이상 들고 있지 않는다
+        self.mpnet_model = getattr(self.encoder, "model", None)
 
         self.ocr_reader = easyocr.Reader(["ko", "en"], gpu=False)
-
-        self.KEYWORDS = ["보육교사", "보육", "영유아보육법", "보육교사자격증", "유치원", "유아교육법", "교육법", "유아", "영유아"]
-        self.REFERENCES = [
-            "보육교사", "영유아보육법에 따라 보육교사의", "보육교사 1급", 
-            "보육교사 2급", "보육교사 3급", "교원 자격증", "교육부장관"
-        ]
+        self.ocr_pool = ThreadPoolExecutor(max_workers=ocr_workers, thread_name_prefix="ocr")
+        self.early_exit = early_exit
+        self.preprocess = {**DEFAULT_PREPROCESS, **(preprocess or {})}
+        self.short_circuit = short_circuit
+        self.keyword_matcher = KeywordMatcher(
+            self.KEYWORDS + self.REFERENCES
+            + [phrase for rule in self.STRONG_EVIDENCE for group in rule for phrase in group]
+        )
 
         self.threshold = similarity_threshold
+        self.cache_dir = cache_dir
+        self.batcher = EncodeBatcher(self.encode_batch, max_batch_size=batch_size, max_wait_ms=batch_wait_ms)
+        self.embedding_cache = EmbeddingCache(max_bytes=embedding_cache_mb * 1024 * 1024)
+        self.persist_top = persist_top
+        if self.embedding_cache_path():
+            loaded = self.embedding_cache.load(self.embedding_cache_path())
+            if loaded:
+                print(f"문장 임베딩 캐시 {loaded}개 불러옴")
+        self.reference_embeddings = self.load_reference_embeddings(self.REFERENCES)
         print("모델 로딩 완료")
 
+    def version(self, base_threshold: float = 0.70) -> str:
+        return verifier_version(
+            self.backend, self.threshold, base_threshold, self.preprocess, self.short_circuit,
+            self.KEYWORDS, self.REFERENCES, self.STRONG_EVIDENCE
+        )
+
+    def reference_cache_path(self, references: list) -> str | None:
+        if not self.cache_dir:
+            return None
+        digest = hashlib.sha256("\n".join([MPNET_MODEL_NAME, self.backend] + references).encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"references_{digest}.npy")
+
+    def embedding_cache_path(self) -> str | None:
+        if not self.cache_dir:
+            return None
+        digest = hashlib.sha256(f"{MPNET_MODEL_NAME}\n{self.backend}".encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"sentences_{digest}")
+
+    def save_embedding_cache(self) -> int:
+        path = self.embedding_cache_path()
+        return self.embedding_cache.save(path, self.persist_top) if path else 0
+
+    def load_reference_embeddings(self, references: list) -> torch.Tensor:
+        path = self.reference_cache_path(references)
+        if path and os.path.exists(path):
+            try:
+                return torch.from_numpy(np.load(path))
+            except Exception as e:
+                print(f"참조 임베딩 캐시 읽기 실패, 다시 계산: {e}")
+
+        embeddings = self.encode_batch(references)[0]
+        if path:
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                tmp_path = f"{path}.{os.getpid()}.tmp"
+                with open(tmp_path, "wb") as f:
+                    np.save(f, embeddings.numpy().astype(np.float32))
+                os.replace(tmp_path, path)
+            except OSError as e:
+                print(f"참조 임베딩 캐시 저장 실패: {e}")
+        return embeddings
+
     def extract_text_mpnet_chandra(self, file_path: str) -> str:
+        return self.extract_text(file_path)[0]
+
+    def extract_text(self, file_path: str) -> tuple:
+        # (추출한 텍스트, 페이지별 처리 시간 목록)
+        pages = []
+        fallback = os.path.splitext(os.path.basename(file_path))[0]
         try:
             ext = os.path.splitext(file_path)[1].lower()
 
             if ext in ['.png', '.jpg', '.jpeg', '.tiff', '.bmp', '.webp']:
                 image = Image.open(file_path).convert("RGB")
-                result = self.easyocr_reader.readtext(np.array(image))
-                text = " ".join([txt for _, txt, conf in result if conf > 0.3])
-                return re.sub(r"\s+", " ", text).strip()
+                text, info = self.ocr_page(image)
+                pages.append({"page": 1, "source": "ocr", **info, "chars": len(text)})
+                return re.sub(r"\s+", " ", text).strip(), pages
             
             elif ext == '.pdf':
-                doc = fitz.open(file_path)
-
-                text_chunks = []
-                for page_num in range(min(3, len(doc))):
-                    page = doc[page_num]
-                    text = page.get_text()
-                    if text.strip():
-                        text_chunks.append(text)
-                
-                full_text = re.sub(r"\s+", " ", " ".join(text_chunks)).strip()
-
-                if len(full_text) > 30:
-                    doc.close()
-                    return full_text
-                
-                ocr_chunks = []
-                for page_num in range(min(3, len(doc))):
-                    page = doc[page_num]
-                    pix = page.get_pixmap(dpi=150)
-                    img_data = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-                    
-                    ocr_result = self.easyocr_reader.readtext(np.array(img_data))
-                    page_ocr = " ".join([txt for _, txt, conf in ocr_result if conf > 0.3])
-                    if page_ocr.strip():
-                        ocr_chunks.append(page_ocr)
-                
-                ocr_text = re.sub(r"\s+", " ", " ".join(ocr_chunks)).strip()
-                doc.close()
-                print(f"PyMuPDF+EasyOCR: {len(ocr_text)}자")
-                return ocr_text if ocr_text else os.path.splitext(os.path.basename(file_path))[0]
+                text = self.extract_pdf_text(file_path, pages)
+                return (text if text else fallback), pages
             
             else:
                 print(f"미지원 형식: {ext}")
-                return os.path.splitext(os.path.basename(file_path))[0]
+                return fallback, pages
         
         except Exception as e:
             print(f"처리 실패: {e}")
-            return os.path.splitext(os.path.basename(file_path))[0]
+            return fallback, pages
+
+    def extract_pdf_text(self, file_path: str, pages: list) -> str:
+        doc = fitz.open(file_path)
+        try:
+            page_count = min(PDF_MAX_PAGES, len(doc))
+
+            # 1단계: 텍스트 레이어. 충분히 나오면 OCR 없이 끝낸다
+            text_chunks = []
+            for page_num in range(page_count):
+                started = time.perf_counter()
+                text = doc[page_num].get_text()
+                pages.append({"page": page_num + 1, "source": "text", "text_ms": _elapsed_ms(started), "chars": len(text.strip())})
+                if text.strip():
+                    text_chunks.append(text)
+
+            full_text = re.sub(r"\s+", " ", " ".join(text_chunks)).strip()
+            if len(full_text) > 30:
+                return full_text
+
+            # 2단계: 페이지를 렌더링하는 대로 OCR 풀에 넘기고, 확실한 문구가 나온 페이지가 있으면 나머지는 건너뛴다.
+            # fitz 문서는 스레드 간에 공유할 수 없으므로 렌더링은 이 스레드에서만 한다
+            ocr_texts = {}
+            pending = {}
+            found = False
+            for page_num in range(page_count):
+                found = self.collect_ocr(pending, ocr_texts, pages, block=False)
+                if found:
+                    break
+                started = time.perf_counter()
+                page = doc[page_num]
+                dpi = render_dpi(page.rect.width, page.rect.height, self.preprocess, OCR_DPI)
+                pix = page.get_pixmap(dpi=dpi)
+                img_data = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+                pages[page_num].update(source="ocr", dpi=dpi, render_ms=_elapsed_ms(started))
+                pending[self.ocr_pool.submit(self.ocr_page, img_data)] = page_num
+            if not found:
+                self.collect_ocr(pending, ocr_texts, pages, block=True)
+
+            for page in pages:
+                if page["source"] == "text" or (page["source"] == "ocr" and page["page"] - 1 not in ocr_texts):
+                    page["source"] = "skipped"
+
+            ocr_text = re.sub(r"\s+", " ", " ".join(ocr_texts[k] for k in sorted(ocr_texts))).strip()
+            print(f"PyMuPDF+EasyOCR: {len(ocr_text)}자 ({len(ocr_texts)}/{page_count}쪽)")
+            return ocr_text
+        finally:
+            doc.close()
+
+    def collect_ocr(self, pending: dict, ocr_texts: dict, pages: list, block: bool) -> bool:
+        # 끝난 OCR 결과를 모은다. early_exit이면 참조 문구가 그대로 나온 순간 남은 페이지를 취소하고 True를 돌려준다
+        futures = as_completed(list(pending)) if block else [f for f in list(pending) if f.done()]
+        for future in futures:
+            page_num = pending.pop(future)
+            text, info = future.result()
+            ocr_texts[page_num] = text
+            pages[page_num].update(info, chars=len(text))
+            if self.early_exit and self.has_confident_match(text):
+                for rest in pending:
+                    rest.cancel()
+                pending.clear()
+                return True
+        return False
 
+    def has_confident_match(self, text: str) -> bool:
+        counts = self.keyword_matcher.count(text)
+        return any(counts[ref] for ref in self.REFERENCES)
 
-    def mpnet_encode(self, sentences: list) -> torch.Tensor:
+    def strong_evidence(self, counts: dict) -> list | None:
+        # 만족한 규칙에서 실제로 찾은 문구들. 없으면 None
+        for rule in self.STRONG_EVIDENCE:
+            found = [next((phrase for phrase in group if counts.get(phrase)), None) for group in rule]
+            if all(found):
+                return found
+        return None
+
+    def ocr_page(self, image) -> tuple:
+        started = time.perf_counter()
+        image = preprocess_image(image, self.preprocess)
+        preprocess_ms = _elapsed_ms(started)
+
+        started = time.perf_counter()
+        result = self.ocr_reader.readtext(np.array(image))
+        text = " ".join([txt for _, txt, conf in result if conf > 0.3])
+        return text, {"preprocess_ms": preprocess_ms, "ocr_ms": _elapsed_ms(started), "pixels": image.width * image.height}
+
+
+    def mpnet_encode(self, sentences: list, stats: dict | None = None) -> torch.Tensor:
+        # 캐시에 없는 문장만 인코딩한다. 여러 요청이 동시에 들어오면 batcher가 문장을 모아 한 번에 처리한다.
+        # stats를 넘기면 인코딩 시간, 토큰 수, 캐시 적중 수를 더해 준다
         if not sentences: return torch.empty((0, 768))
-        encoded_input = self.mpnet_tokenizer(sentences, padding=True, truncation=True, max_length=384, return_tensors="pt")
-        with torch.no_grad():
-            model_output = self.mpnet_model(**encoded_input)
-            embeddings = model_output.last_hidden_state[:, 0, :]
-        return torch.nn.functional.normalize(embeddings, p=2, dim=1)
+        started = time.perf_counter()
+        keys = [normalize_sentence(s) for s in sentences]
+        unique = list(dict.fromkeys(keys))
+        found = self.embedding_cache.get_many(unique)
+        missing = [key for key in unique if key not in found]
+        info = {}
+        if stats is not None:
+            stats["cached_sentences"] = stats.get("cached_sentences", 0) + len(found)
+        if missing:
+            embeddings, info = self.batcher.encode(missing)
+            embeddings = embeddings.numpy().astype(np.float32)
+            self.embedding_cache.put_many(missing, embeddings)
+            found.update(zip(missing, embeddings))
+        if stats is not None:
+            for key in ("queue_wait_ms", "tokenize_ms", "forward_ms", "tokens"):
+                stats[key] = round(stats.get(key, 0) + info.get(key, 0), 2)
+            stats["encode_ms"] = round(stats.get("encode_ms", 0) + _elapsed_ms(started), 2)
+        return torch.from_numpy(np.stack([found[key] for key in keys]))
+
+    def encode_batch(self, sentences: list) -> tuple:
+        return self.encoder.encode_with_stats(sentences)
 
     def preprocess_sentences(self, text: str) -> list:
         text = re.sub(r"[^\w\s가-힣\.!?0-9]", " ", text)            
@@ -94,74 +262,118 @@ class ChildcareDocumentClassifier:
         text = re.sub(r"(습니다\.|입니다\.|다\.|요\.)", r"\1<SPLIT>", text)
         text = re.sub(r"([\.!?])", r"\1<SPLIT>", text)
         sentences = text.split("<SPLIT>")
-        return [s.strip() for s in sentences if len(s.strip()) > 5]
-
-    def compute_mpnet_similarity(
-        self, ref_embedding: torch.Tensor, doc_embeddings: torch.Tensor
-    ) -> tuple:
-        if doc_embeddings.numel() == 0:
-            return 0.0, 0
-        similarities = torch.nn.functional.cosine_similarity(
-            ref_embedding.unsqueeze(0),
-            doc_embeddings,
-            dim=1,
-        )
-        return float(similarities.max()), int(similarities.argmax())
-    
-    def classify_childcare_document(self, file_path: str, reference_sentences: list) -> dict:
-        result = {
+        # 같은 문장이 여러 번 나와도 최대 유사도는 같으므로 처음 것만 남긴다
+        return list(dict.fromkeys(s.strip() for s in sentences if len(s.strip()) > 5))
+
+    def new_result(self, raw_text: str = "", page_timings: list | None = None) -> dict:
+        return {
             "verdict": False, "max_confidence": 0.0, "matched_sentence": "",
-            "total_sentences": 0, "raw_text": "", "reason": ""
+            "total_sentences": 0, "raw_text": raw_text, "reason": "", "page_timings": page_timings or [],
+            "timings": {}, "sizes": {}
         }
 
-        raw_text = self.extract_text_mpnet_chandra(file_path)
-        result["raw_text"] = raw_text
+    def extraction_timings(self, page_timings: list, started: float) -> dict:
+        # 페이지별 기록을 단계별 합계로 묶는다
+        timings = {"extract_ms": _elapsed_ms(started)}
+        for stage, key in (("text_layer_ms", "text_ms"), ("render_ms", "render_ms"),
+                           ("preprocess_ms", "preprocess_ms"), ("ocr_ms", "ocr_ms")):
+            values = [page[key] for page in page_timings if key in page]
+            if values:
+                timings[stage] = round(sum(values), 2)
+        return timings
 
+    def finish_timings(self, result: dict, timings: dict, started: float):
+        timings["total_ms"] = _elapsed_ms(started)
+        pages = result["page_timings"]
+        result["sizes"] = {
+            "pages": len(pages),
+            "pixels": sum(page.get("pixels", 0) for page in pages),
+            "sentences": result["total_sentences"],
+            "tokens": timings.pop("tokens", 0),
+            "cached_sentences": timings.pop("cached_sentences", 0),
+        }
+        result["timings"] = timings
+        stage_metrics.observe_many(timings)
+
+    def classify_childcare_document(self, file_path: str, reference_sentences: list) -> dict:
+        started = time.perf_counter()
+        raw_text, page_timings = self.extract_text(file_path)
+        timings = self.extraction_timings(page_timings, started)
+        result = self.score_text(raw_text, page_timings, reference_sentences, timings)
+        self.finish_timings(result, timings, started)
+        return result
+
+    def score_text(self, raw_text: str, page_timings: list, reference_sentences: list, timings: dict | None = None) -> dict:
+        result = self.new_result(raw_text, page_timings)
+        timings = {} if timings is None else timings
+
+        started = time.perf_counter()
         doc_sentences = self.preprocess_sentences(raw_text)
         result["total_sentences"] = len(doc_sentences)
+        timings["split_ms"] = _elapsed_ms(started)
 
         if len(doc_sentences) == 0:
             result["reason"] = "문장 없음"
             return result
 
-        all_sentences = reference_sentences + doc_sentences
-        all_embeddings = self.mpnet_encode(all_sentences)
+        if list(reference_sentences) == self.REFERENCES:
+            ref_embeddings = self.reference_embeddings
+        else:
+            ref_embeddings = self.mpnet_encode(list(reference_sentences), timings)
+        doc_embeddings = self.mpnet_encode(doc_sentences, timings)
 
-        ref_embeddings = all_embeddings[: len(reference_sentences)]
-        doc_embeddings = all_embeddings[len(reference_sentences) :]
+        # 정규화된 임베딩이므로 행렬곱이 곧 코사인 유사도 (문서 문장 x 참조 문장)
+        started = time.perf_counter()
+        similarities = doc_embeddings @ ref_embeddings.T
+        best_idx = int(similarities.argmax())
+        doc_idx = best_idx // similarities.shape[1]
+        max_score = float(similarities.max())
+        timings["similarity_ms"] = _elapsed_ms(started)
 
-        best_matches = []
-        for i, ref_emb in enumerate(ref_embeddings):
-            score, doc_idx = self.compute_mpnet_similarity(ref_emb, doc_embeddings)
-            best_matches.append(
-                {
-                    "ref_idx": i,
-                    "score": score,
-                    "matched_sentence": doc_sentences[doc_idx],
-                }
-            )
-
-        max_match = max(best_matches, key=lambda x: x["score"])
-        result["max_confidence"] = round(max_match["score"], 4)
-        result["matched_sentence"] = max_match["matched_sentence"]
-        result["verdict"] = max_match["score"] >= self.threshold
+        result["max_confidence"] = round(max_score, 4)
+        result["matched_sentence"] = doc_sentences[doc_idx]
+        result["verdict"] = max_score >= self.threshold
 
         return result
 
-def classify_childcare_with_rules(self, file_path: str, base_threshold=0.70):
-    result = self.classify_childcare_document(file_path, self.REFERENCES)
-    score = result.get("max_confidence", 0.0)
-    raw_text = result.get("raw_text", "")
+    def classify_with_rules(self, file_path: str, base_threshold=0.70):
+        started = time.perf_counter()
+        raw_text, page_timings = self.extract_text(file_path)
+        timings = self.extraction_timings(page_timings, started)
+
+        # 키워드, 참조 문장, 강한 근거 문구를 텍스트 한 번 훑어서 모두 센다
+        keyword_started = time.perf_counter()
+        counts = self.keyword_matcher.count(raw_text)
+        hit_count = sum(counts[kw] for kw in self.KEYWORDS)
+        timings["keyword_ms"] = _elapsed_ms(keyword_started)
 
-    hit_count = sum(raw_text.count(kw) for kw in self.KEYWORDS)
-    score += 0.02 * hit_count if hit_count > 0 else -0.05
+        evidence = self.strong_evidence(counts) if self.short_circuit else None
+        if evidence:
+            result = self.new_result(raw_text, page_timings)
+            result["total_sentences"] = len(self.preprocess_sentences(raw_text))
+            result["matched_sentence"] = ", ".join(evidence)
+            result["reason"] = "정확한 문구 일치"
+            result["short_circuit"] = True
+            score = self.SHORT_CIRCUIT_SCORE
+        else:
+            result = self.score_text(raw_text, page_timings, self.REFERENCES, timings)
+            result["short_circuit"] = False
+            score = result.get("max_confidence", 0.0)
+            score += 0.02 * hit_count if hit_count > 0 else -0.05
         
-    result["rule_score"] = round(score, 4)
-    result["verdict"] = score >= base_threshold
-    result["keyword_hit_count"] = hit_count
-    return result
-
-@classmethod
-def load_model(cls, load_path: str):
-    with open(load_path, 'rb') as f:
-        return pickle.load(f)
\ No newline at end of file
+        result["rule_score"] = round(score, 4)
+        result["verdict"] = score >= base_threshold
+        result["keyword_hit_count"] = hit_count
+        self.finish_timings(result, timings, started)
+        return result
+
+    classify_childcare_with_rules = classify_with_rules
+
+    @classmethod
+    def load_model(cls, load_path: str):
+        with open(load_path, 'rb') as f:
+            return pickle.load(f)
+
+
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 2)
\ No newline at end of file
@@ -0,0 +1,112 @@
+import json
+import os
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+import numpy as np
+
+# 항목당 키/OrderedDict 관리 비용 추정치(바이트). 벡터 크기에 더해 메모리 한도를 계산한다
+ENTRY_OVERHEAD = 200
+
+
+def normalize_sentence(sentence: str) -> str:
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFC", sentence)).strip()
+
+
+class EmbeddingCache:
+    # 정규화한 문장 -> float32 임베딩 LRU. 같은 발급 기관의 상투 문구를 문서마다 다시 인코딩하지 않는다
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.data = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _entry_bytes(self, key: str, vector: np.ndarray) -> int:
+        return vector.nbytes + len(key.encode("utf-8")) + ENTRY_OVERHEAD
+
+    def get_many(self, keys: list) -> dict:
+        found = {}
+        with self.lock:
+            for key in keys:
+                vector = self.data.get(key)
+                if vector is None:
+                    self.misses += 1
+                    continue
+                self.data.move_to_end(key)
+                self.hits += 1
+                found[key] = vector
+        return found
+
+    def put_many(self, keys: list, vectors: np.ndarray):
+        with self.lock:
+            for key, vector in zip(keys, vectors):
+                self._put(key, np.asarray(vector, dtype=np.float32))
+            while self.bytes > self.max_bytes and self.data:
+                old_key, old_vector = self.data.popitem(last=False)
+                self.bytes -= self._entry_bytes(old_key, old_vector)
+                self.evictions += 1
+
+    def _put(self, key: str, vector: np.ndarray):
+        if key in self.data:
+            self.bytes -= self._entry_bytes(key, self.data[key])
+        self.data[key] = vector
+        self.data.move_to_end(key)
+        self.bytes += self._entry_bytes(key, vector)
+
+    def save(self, path: str, top_n: int = 5000) -> int:
+        # 최근에 쓴 top_n개를 float32 행렬(.npy)과 키 목록(.json)으로 저장한다
+        with self.lock:
+            items = list(self.data.items())[-top_n:]
+        if not items:
+            return 0
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        keys = [key for key, _ in items]
+        matrix = np.stack([vector for _, vector in items]).astype(np.float32)
+
+        tmp_suffix = f".{os.getpid()}.tmp"
+        with open(f"{path}.npy{tmp_suffix}", "wb") as f:
+            np.save(f, matrix)
+        with open(f"{path}.json{tmp_suffix}", "w", encoding="utf-8") as f:
+            json.dump(keys, f, ensure_ascii=False)
+        os.replace(f"{path}.npy{tmp_suffix}", f"{path}.npy")
+        os.replace(f"{path}.json{tmp_suffix}", f"{path}.json")
+        return len(keys)
+
+    def load(self, path: str) -> int:
+        # 행렬은 mmap으로 열어 복사 없이 바로 쓴다. 실제로 읽힌 행만 메모리에 올라온다
+        if not (os.path.exists(f"{path}.npy") and os.path.exists(f"{path}.json")):
+            return 0
+        try:
+            matrix = np.load(f"{path}.npy", mmap_mode="r")
+            with open(f"{path}.json", encoding="utf-8") as f:
+                keys = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"문장 임베딩 캐시 읽기 실패: {e}")
+            return 0
+        if len(keys) != len(matrix):
+            print("문장 임베딩 캐시 키/행렬 크기가 달라 무시합니다.")
+            return 0
+        with self.lock:
+            for key, vector in zip(keys, matrix):
+                self._put(key, vector)
+            while self.bytes > self.max_bytes and self.data:
+                old_key, old_vector = self.data.popitem(last=False)
+                self.bytes -= self._entry_bytes(old_key, old_vector)
+        return len(keys)
+
+    def stats(self) -> dict:
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self.data),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
@@ -0,0 +1,192 @@
+import argparse
+import os
+import sys
+import time
+import numpy as np
+import torch
+
+
+ENCODER_BACKENDS = ("torch", "int8", "onnx")
+MAX_LENGTH = 384
+ENCODE_BATCH_SIZE = 32
+
+
+class TorchEncoder:
+    name = "torch"
+
+    def __init__(self, tokenizer, model, batch_size: int = ENCODE_BATCH_SIZE):
+        self.tokenizer = tokenizer
+        self.model = model
+        self.model.eval()
+        self.batch_size = batch_size
+
+    def forward(self, encoded_input) -> torch.Tensor:
+        with torch.no_grad():
+            return self.model(**encoded_input).last_hidden_state[:, 0, :]
+
+    def encode(self, sentences: list) -> torch.Tensor:
+        return self.encode_with_stats(sentences)[0]
+
+    def encode_with_stats(self, sentences: list) -> tuple:
+        # 중복 문장은 한 번만 인코딩하고, 토큰 길이순으로 정렬해 비슷한 길이끼리 batch_size개씩 묶는다.
+        # 그러면 짧은 OCR 조각이 긴 문장 길이만큼 패딩되지 않는다. 결과는 입력 순서로 되돌려 준다
+        stats = {"tokenize_ms": 0.0, "forward_ms": 0.0, "padded_tokens": 0, "token_counts": []}
+        if not sentences: return torch.empty((0, 768)), stats
+        started = time.perf_counter()
+        unique = list(dict.fromkeys(sentences))
+        token_ids = self.tokenizer(unique, truncation=True, max_length=MAX_LENGTH)["input_ids"]
+        order = sorted(range(len(unique)), key=lambda i: len(token_ids[i]))
+        stats["tokenize_ms"] = _elapsed_ms(started)
+
+        started = time.perf_counter()
+        unique_embeddings = [None] * len(unique)
+        for start in range(0, len(order), self.batch_size):
+            bucket = order[start: start + self.batch_size]
+            padded = self.pad([token_ids[i] for i in bucket])
+            stats["padded_tokens"] += padded["input_ids"].numel()
+            embeddings = self.forward(padded)
+            for row, i in enumerate(bucket):
+                unique_embeddings[i] = embeddings[row]
+        stats["forward_ms"] = _elapsed_ms(started)
+
+        position = {sentence: i for i, sentence in enumerate(unique)}
+        embeddings = torch.stack([unique_embeddings[position[sentence]] for sentence in sentences])
+        stats["token_counts"] = [len(token_ids[position[sentence]]) for sentence in sentences]
+        return torch.nn.functional.normalize(embeddings, p=2, dim=1), stats
+
+    def pad(self, token_ids: list) -> dict:
+        width = max(len(ids) for ids in token_ids)
+        input_ids = torch.full((len(token_ids), width), self.tokenizer.pad_token_id, dtype=torch.long)
+        attention_mask = torch.zeros((len(token_ids), width), dtype=torch.long)
+        for row, ids in enumerate(token_ids):
+            input_ids[row, :len(ids)] = torch.tensor(ids, dtype=torch.long)
+            attention_mask[row, :len(ids)] = 1
+        return {"input_ids": input_ids, "attention_mask": attention_mask}
+
+
+class Int8Encoder(TorchEncoder):
+    # Linear 층만 int8로 동적 양자화. CPU에서 메모리와 matmul 시간이 줄어든다
+    name = "int8"
+
+    def __init__(self, tokenizer, model, batch_size: int = ENCODE_BATCH_SIZE):
+        quantized = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        super().__init__(tokenizer, quantized, batch_size)
+
+
+class OnnxEncoder(TorchEncoder):
+    name = "onnx"
+
+    def __init__(self, tokenizer, model, onnx_path: str, batch_size: int = ENCODE_BATCH_SIZE):
+        try:
+            import onnxruntime
+        except ImportError:
+            raise RuntimeError("onnx 백엔드를 쓰려면 onnxruntime을 설치해야 합니다.")
+
+        self.tokenizer = tokenizer
+        self.batch_size = batch_size
+        if not os.path.exists(onnx_path):
+            export_onnx(tokenizer, model, onnx_path)
+
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = onnxruntime.InferenceSession(onnx_path, options, providers=["CPUExecutionProvider"])
+
+    def forward(self, encoded_input) -> torch.Tensor:
+        (hidden,) = self.session.run(["last_hidden_state"], {
+            "input_ids": encoded_input["input_ids"].numpy(),
+            "attention_mask": encoded_input["attention_mask"].numpy(),
+        })
+        return torch.from_numpy(hidden[:, 0, :])
+
+
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 2)
+
+
+def export_onnx(tokenizer, model, onnx_path: str):
+    print(f"MPNet ONNX 변환 중: {onnx_path}")
+    os.makedirs(os.path.dirname(onnx_path) or ".", exist_ok=True)
+    sample = tokenizer(["보육교사 자격증"], return_tensors="pt")
+    tmp_path = f"{onnx_path}.{os.getpid()}.tmp"
+    model.eval()
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            (sample["input_ids"], sample["attention_mask"]),
+            tmp_path,
+            input_names=["input_ids", "attention_mask"],
+            output_names=["last_hidden_state"],
+            dynamic_axes={
+                "input_ids": {0: "batch", 1: "sequence"},
+                "attention_mask": {0: "batch", 1: "sequence"},
+                "last_hidden_state": {0: "batch", 1: "sequence"},
+            },
+            opset_version=14,
+        )
+    os.replace(tmp_path, onnx_path)
+
+
+def build_encoder(backend: str, tokenizer, model, cache_dir: str | None = None,
+                  batch_size: int = ENCODE_BATCH_SIZE) -> TorchEncoder:
+    if backend == "torch":
+        return TorchEncoder(tokenizer, model, batch_size)
+    if backend == "int8":
+        return Int8Encoder(tokenizer, model, batch_size)
+    if backend == "onnx":
+        onnx_dir = cache_dir or os.path.join(os.path.expanduser("~"), ".cache", "childcare_verifier")
+        return OnnxEncoder(tokenizer, model, os.path.join(onnx_dir, "mpnet.onnx"), batch_size)
+    raise ValueError(f"지원하지 않는 인코더 백엔드: {backend} (가능: {', '.join(ENCODER_BACKENDS)})")
+
+
+# 백엔드 비교용 고정 문장. 실제 증명서에서 자주 나오는 문장과 관계없는 문장을 섞었다
+PARITY_CORPUS = [
+    "위 사람은 영유아보육법 제22조에 따라 보육교사 2급 자격을 취득하였음을 증명합니다.",
+    "보육교사 1급 자격증",
+    "보건복지부장관",
+    "교육부장관 유치원 정교사 2급",
+    "성명 홍길동 생년월일 1990년 1월 1일",
+    "자격번호 제 2020-123456 호",
+    "This certifies that the holder has completed the childcare teacher program.",
+    "주민등록등본 발급 신청서",
+    "건강진단결과서 검사 결과 이상 없음",
+    "영수증 합계 금액 12,000원",
+]
+
+
+def parity_check(backends: list, tolerance: float = 0.02, cache_dir: str | None = None) -> bool:
+    # torch 구현과 각 백엔드의 (문장 x 참조) 코사인 점수를 비교한다
+    from transformers import AutoTokenizer, AutoModel
+    from .document import MPNET_MODEL_NAME, DEFAULT_CACHE_DIR, ChildcareDocumentClassifier
+
+    references = ChildcareDocumentClassifier.REFERENCES
+    tokenizer = AutoTokenizer.from_pretrained(MPNET_MODEL_NAME)
+
+    def scores(encoder):
+        start = time.perf_counter()
+        doc = encoder.encode(PARITY_CORPUS)
+        ref = encoder.encode(references)
+        elapsed = time.perf_counter() - start
+        return (doc @ ref.T).numpy(), elapsed
+
+    baseline, baseline_time = scores(TorchEncoder(tokenizer, AutoModel.from_pretrained(MPNET_MODEL_NAME)))
+    print(f"torch: {baseline_time * 1000:.1f}ms")
+
+    passed = True
+    for backend in backends:
+        encoder = build_encoder(backend, tokenizer, AutoModel.from_pretrained(MPNET_MODEL_NAME), cache_dir or DEFAULT_CACHE_DIR)
+        candidate, elapsed = scores(encoder)
+        max_diff = float(np.abs(candidate - baseline).max())
+        same_best = bool((candidate.argmax(axis=0) == baseline.argmax(axis=0)).all())
+        ok = max_diff <= tolerance and same_best
+        passed = passed and ok
+        print(f"{backend}: {elapsed * 1000:.1f}ms, 최대 점수 차이 {max_diff:.4f}, 최고 일치 문장 동일 {same_best} -> {'통과' if ok else '실패'}")
+    return passed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="MPNet 인코더 백엔드 점수 일치 검사")
+    parser.add_argument("--backends", nargs="+", default=["int8", "onnx"], choices=ENCODER_BACKENDS)
+    parser.add_argument("--tolerance", type=float, default=0.02)
+    parser.add_argument("--cache-dir", default=None)
+    args = parser.parse_args()
+    sys.exit(0 if parity_check(args.backends, args.tolerance, args.cache_dir) else 1)
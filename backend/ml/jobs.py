@@ -0,0 +1,196 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+
+from ..database import SessionLocal
+from .. import models
+from .metrics import stage_metrics
+from .result_cache import verification_cache, verification_summary
+
+VERIFY_WORKERS = int(os.environ.get("VERIFY_WORKERS", "2"))
+VERIFY_MAX_PENDING = int(os.environ.get("VERIFY_MAX_PENDING", "16"))
+
+_worker_verifier = None
+
+
+def _init_worker(similarity_threshold: float):
+    # 워커 프로세스마다 모델을 한 번만 올려 두고 작업 간에 재사용한다
+    global _worker_verifier
+    from .document import ChildcareDocumentClassifier
+    _worker_verifier = ChildcareDocumentClassifier(similarity_threshold=similarity_threshold)
+
+
+def _verify(file_path: str, base_threshold: float) -> tuple:
+    # (결과 요약, 단계별 소요 시간). 워커 프로세스의 stage_metrics는 /metrics에 보이지 않으므로 시간을 같이 돌려준다
+    result = _worker_verifier.classify_with_rules(file_path=file_path, base_threshold=base_threshold)
+    return verification_summary(result), result.get("timings", {})
+
+
+class JobQueueFull(Exception):
+    pass
+
+
+class VerificationJobs:
+    # 증명서 검증을 별도 프로세스 풀에서 돌리고, 끝나면 User.is_verified를 갱신한 뒤 대기 중인 websocket에 알린다
+    def __init__(self, max_workers: int = VERIFY_WORKERS, max_pending: int = VERIFY_MAX_PENDING,
+                 max_jobs: int = 1000, similarity_threshold: float = 0.70):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.max_jobs = max_jobs
+        self.similarity_threshold = similarity_threshold
+        self.lock = threading.Lock()
+        self.executor = None
+        self.jobs = OrderedDict()
+        self.waiters = {}
+        self.pending = 0
+
+    def _ensure_executor(self) -> ProcessPoolExecutor:
+        if self.executor is None:
+            # torch가 올라간 부모 프로세스를 fork하지 않도록 spawn으로 띄운다
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.similarity_threshold,),
+            )
+        return self.executor
+
+    def submit(self, user_id: int, file_path: str, base_threshold: float = 0.70, cache_key: tuple | None = None) -> dict:
+        loop = asyncio.get_running_loop()
+        with self.lock:
+            if self.pending >= self.max_pending:
+                raise JobQueueFull()
+            job_id = uuid.uuid4().hex
+            job = {
+                "job_id": job_id,
+                "user_id": user_id,
+                "file_path": file_path,
+                "cache_key": cache_key,
+                "status": "queued",
+                "is_verified": None,
+                "rule_score": None,
+                "keyword_hits": None,
+                "error": None,
+                "created_at": datetime.utcnow().isoformat(),
+                "finished_at": None,
+            }
+            self.jobs[job_id] = job
+            self.waiters[job_id] = []
+            self.pending += 1
+            self._trim()
+            future = self._ensure_executor().submit(_verify, file_path, base_threshold)
+
+        future.add_done_callback(lambda f: self._on_done(job_id, f, loop))
+        return dict(job)
+
+    def _trim(self):
+        # 오래된 완료 작업부터 지워 기록이 무한히 쌓이지 않게 한다
+        for job_id in list(self.jobs):
+            if len(self.jobs) <= self.max_jobs:
+                break
+            if self.jobs[job_id]["status"] in ("done", "failed"):
+                del self.jobs[job_id]
+
+    def _on_done(self, job_id: str, future, loop):
+        outcome, error = None, None
+        if future.cancelled():
+            error = "cancelled"
+        else:
+            try:
+                outcome, timings = future.result()
+                stage_metrics.observe_many(timings)
+            except Exception as e:
+                error = str(e) or e.__class__.__name__
+                print(f"문서 검증 작업 실패 ({job_id}): {error}")
+                if isinstance(e, BrokenProcessPool):
+                    # 워커가 죽은 풀은 다시 쓸 수 없으므로 다음 요청에서 새로 띄운다
+                    with self.lock:
+                        self.executor = None
+
+        with self.lock:
+            job = self.jobs.get(job_id)
+        if job is not None and outcome is not None:
+            try:
+                self._save_result(job, outcome)
+                if job["cache_key"]:
+                    verification_cache.set(*job["cache_key"], outcome)
+            except Exception as e:
+                outcome, error = None, f"결과 저장 실패: {e}"
+                print(f"문서 검증 작업 실패 ({job_id}): {error}")
+        if job is not None and outcome is None and os.path.exists(job["file_path"]):
+            os.remove(job["file_path"])
+
+        with self.lock:
+            self.pending -= 1
+            if job is not None:
+                if outcome is not None:
+                    job.update(outcome)
+                    job["status"] = "done"
+                else:
+                    job["status"] = "failed"
+                    job["error"] = error
+                job["finished_at"] = datetime.utcnow().isoformat()
+            waiters = self.waiters.pop(job_id, [])
+
+        for waiter in waiters:
+            try:
+                loop.call_soon_threadsafe(_resolve, waiter)
+            except RuntimeError:
+                # 서버 종료로 이벤트 루프가 이미 닫힌 경우
+                pass
+
+    def _save_result(self, job: dict, outcome: dict):
+        db = SessionLocal()
+        try:
+            user = db.query(models.User).filter(models.User.id == job["user_id"]).first()
+            if user:
+                user.certificate_path = job["file_path"]
+                user.is_verified = outcome["is_verified"]
+                db.commit()
+        finally:
+            db.close()
+
+    def get(self, job_id: str) -> dict | None:
+        with self.lock:
+            job = self.jobs.get(job_id)
+            return dict(job) if job else None
+
+    async def wait(self, job_id: str) -> dict | None:
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return None
+            if job["status"] in ("done", "failed"):
+                return dict(job)
+            waiter = asyncio.get_running_loop().create_future()
+            self.waiters[job_id].append(waiter)
+        await waiter
+        return self.get(job_id)
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "workers": self.max_workers,
+                "max_pending": self.max_pending,
+                "pending": self.pending,
+                "jobs": len(self.jobs),
+            }
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+
+def _resolve(waiter):
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+verification_jobs = VerificationJobs()
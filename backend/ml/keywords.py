@@ -0,0 +1,47 @@
+from collections import deque
+
+
+class KeywordMatcher:
+    # Aho-Corasick 오토마톤. 여러 문구의 등장 횟수를 텍스트 한 번 훑어서 모두 센다
+    def __init__(self, patterns: list):
+        self.patterns = list(dict.fromkeys(p for p in patterns if p))
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+
+        for index, pattern in enumerate(self.patterns):
+            state = 0
+            for char in pattern:
+                if char not in self.goto[state]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                    self.goto[state][char] = len(self.goto) - 1
+                state = self.goto[state][char]
+            self.output[state].append(index)
+
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self.goto[state].items():
+                queue.append(child)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(char, 0)
+                self.output[child] = self.output[child] + self.output[self.fail[child]]
+
+    def count(self, text: str) -> dict:
+        # 문구별 등장 횟수. 같은 문구끼리는 겹치지 않게 세어 str.count와 같은 값을 낸다
+        counts = [0] * len(self.patterns)
+        last_end = [-1] * len(self.patterns)
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(char, 0)
+            for index in self.output[state]:
+                if position - len(self.patterns[index]) >= last_end[index]:
+                    counts[index] += 1
+                    last_end[index] = position
+        return dict(zip(self.patterns, counts))
@@ -0,0 +1,68 @@
+import bisect
+import threading
+
+# 히스토그램 버킷 상한(ms). 마지막 버킷은 그보다 큰 값 전부
+LATENCY_BUCKETS_MS = [1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000]
+
+
+class LatencyHistogram:
+    def __init__(self, buckets: list = LATENCY_BUCKETS_MS):
+        self.buckets = list(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value_ms: float):
+        self.counts[bisect.bisect_left(self.buckets, value_ms)] += 1
+        self.count += 1
+        self.total += value_ms
+        self.max = max(self.max, value_ms)
+
+    def quantile(self, q: float) -> float:
+        # 버킷 상한으로 근사한 분위수
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets + [self.max], self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total / self.count, 2) if self.count else 0.0,
+            "p50_ms": self.quantile(0.5),
+            "p95_ms": self.quantile(0.95),
+            "max_ms": round(self.max, 2),
+            "buckets": {f"le_{bound}": count for bound, count in zip(self.buckets, self.counts)}
+                       | {"inf": self.counts[-1]},
+        }
+
+
+class StageMetrics:
+    # 문서 검증 단계별(파일 저장, 텍스트 추출, 렌더링, OCR, 토큰화, MPNet, 유사도 등) 지연 시간 누적
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = {}
+
+    def observe(self, stage: str, value_ms: float):
+        with self.lock:
+            if stage not in self.histograms:
+                self.histograms[stage] = LatencyHistogram()
+            self.histograms[stage].observe(value_ms)
+
+    def observe_many(self, timings: dict):
+        for key, value in timings.items():
+            if key.endswith("_ms"):
+                self.observe(key[:-3], value)
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {stage: hist.snapshot() for stage, hist in sorted(self.histograms.items())}
+
+
+stage_metrics = StageMetrics()
@@ -1,5 +1,6 @@
 import pickle
 import os
+import threading
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent
@@ -7,17 +8,24 @@ BASE_DIR = Path(__file__).resolve().parent
 MODEL_PATH = BASE_DIR / "model_rematch_probability.pkl"
 
 MODEL_OBJECT = None
+# 한 번 실패하면(파일 없음, lightgbm 미설치 등) 리뷰 요청마다 다시 unpickle 하지 않는다
+MODEL_LOAD_ERROR = None
+_lock = threading.Lock()
 
 def load_prediction_model():
-    global MODEL_OBJECT
-    if MODEL_OBJECT is None:
+    # import 시점이 아니라 처음 필요할 때(또는 서버 warm-up 때) 한 번 읽는다
+    global MODEL_OBJECT, MODEL_LOAD_ERROR
+    with _lock:
+        if MODEL_OBJECT is not None or MODEL_LOAD_ERROR is not None:
+            return MODEL_OBJECT
         try:
             with open(MODEL_PATH, "rb") as f:
                 MODEL_OBJECT = pickle.load(f)
             print(f"모델 로드 성공: {MODEL_PATH}")
         except FileNotFoundError:
-            print(f"모델 파일 찾을 수 없음: {MODEL_PATH}")
+            MODEL_LOAD_ERROR = f"모델 파일 찾을 수 없음: {MODEL_PATH}"
+            print(MODEL_LOAD_ERROR)
         except Exception as e:
-            print(f"모델 로드 중 오류 발생: {e}")
-
-load_prediction_model()
\ No newline at end of file
+            MODEL_LOAD_ERROR = f"모델 로드 중 오류 발생: {e}"
+            print(MODEL_LOAD_ERROR)
+        return MODEL_OBJECT
\ No newline at end of file
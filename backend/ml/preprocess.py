@@ -0,0 +1,145 @@
+import argparse
+import difflib
+import json
+import os
+import time
+import numpy as np
+from PIL import Image
+
+# OCR 전 이미지 전처리 기본값. 분류기 생성 시 preprocess={...}로 일부만 바꿀 수 있다
+DEFAULT_PREPROCESS = {
+    "enabled": True,
+    "max_long_edge": 1600,   # 긴 변을 이 크기로 줄인다 (EasyOCR 시간은 픽셀 수에 비례)
+    "grayscale": True,
+    "auto_crop": True,
+    "min_dpi": 100,          # PDF 렌더링 DPI 범위. 긴 변이 max_long_edge에 가깝게 되도록 고른다
+    "max_dpi": 200,
+}
+
+
+def preprocess_image(image: Image.Image, options: dict) -> Image.Image:
+    if not options["enabled"]:
+        return image
+    if options["grayscale"]:
+        image = image.convert("L")
+    if options["auto_crop"]:
+        image = crop_document(image)
+    return downscale(image, options["max_long_edge"])
+
+
+def downscale(image: Image.Image, max_long_edge: int | None) -> Image.Image:
+    if not max_long_edge or max(image.size) <= max_long_edge:
+        return image
+    scale = max_long_edge / max(image.size)
+    size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+    return image.resize(size, Image.LANCZOS)
+
+
+def crop_document(image: Image.Image, min_area: float = 0.3, margin: float = 0.02) -> Image.Image:
+    # 책상 위에서 찍은 사진처럼 종이가 배경보다 밝은 경우, 밝은 영역의 경계 상자만 남긴다.
+    # 종이가 화면 대부분을 차지하거나 너무 작게 잡히면 잘못 자를 위험이 있어 원본을 그대로 쓴다
+    gray = np.asarray(image.convert("L") if image.mode != "L" else image, dtype=np.uint8)
+    threshold = otsu_threshold(gray)
+    if threshold is None:
+        return image
+    bright = gray > threshold
+
+    rows = np.flatnonzero(bright.mean(axis=1) > 0.5)
+    cols = np.flatnonzero(bright.mean(axis=0) > 0.5)
+    if len(rows) == 0 or len(cols) == 0:
+        return image
+
+    top, bottom, left, right = rows[0], rows[-1] + 1, cols[0], cols[-1] + 1
+    area = (bottom - top) * (right - left) / gray.size
+    if area < min_area or area > 0.95:
+        return image
+
+    pad_y, pad_x = int(gray.shape[0] * margin), int(gray.shape[1] * margin)
+    return image.crop((
+        max(0, left - pad_x), max(0, top - pad_y),
+        min(gray.shape[1], right + pad_x), min(gray.shape[0], bottom + pad_y),
+    ))
+
+
+def otsu_threshold(gray: np.ndarray) -> int | None:
+    hist = np.bincount(gray.ravel(), minlength=256).astype(np.float64)
+    weights = np.cumsum(hist)
+    means = np.cumsum(hist * np.arange(256))
+    total, total_mean = weights[-1], means[-1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        between = (total_mean * weights - means * total) ** 2 / (weights * (total - weights))
+    between = np.nan_to_num(between)
+    if not between.any():
+        # 한 가지 밝기로만 된 이미지
+        return None
+    return int(between.argmax())
+
+
+def render_dpi(page_width_pt: float, page_height_pt: float, options: dict, default_dpi: int) -> int:
+    # 페이지 크기(pt, 1/72인치)에 맞춰 렌더링 결과의 긴 변이 max_long_edge 정도가 되는 DPI
+    if not options["enabled"] or not options["max_long_edge"]:
+        return default_dpi
+    dpi = options["max_long_edge"] / (max(page_width_pt, page_height_pt) / 72)
+    return int(min(options["max_dpi"], max(options["min_dpi"], dpi)))
+
+
+def benchmark(sample_dir: str, output: str | None = None) -> dict:
+    # 같은 샘플을 전처리 없이/있이 검증해 OCR 시간과 결과 차이를 비교한다
+    from .document import ChildcareDocumentClassifier
+
+    files = sorted(
+        os.path.join(sample_dir, name) for name in os.listdir(sample_dir)
+        if os.path.splitext(name)[1].lower() in (".png", ".jpg", ".jpeg", ".pdf")
+    )
+    verifier = ChildcareDocumentClassifier(similarity_threshold=0.70, cache_dir=None)
+    baseline_options = dict(DEFAULT_PREPROCESS, enabled=False)
+    tuned_options = dict(verifier.preprocess)
+
+    rows = []
+    for file_path in files:
+        row = {"file": os.path.basename(file_path)}
+        for label, options in (("baseline", baseline_options), ("preprocessed", tuned_options)):
+            verifier.preprocess = options
+            started = time.perf_counter()
+            result = verifier.classify_with_rules(file_path=file_path, base_threshold=0.70)
+            row[label] = {
+                "seconds": round(time.perf_counter() - started, 3),
+                "ocr_ms": round(sum(page.get("ocr_ms", 0.0) for page in result["page_timings"]), 2),
+                "pixels": sum(page.get("pixels", 0) for page in result["page_timings"]),
+                "verdict": bool(result["verdict"]),
+                "rule_score": result.get("rule_score", 0.0),
+                "raw_text": result["raw_text"],
+            }
+        row["text_similarity"] = round(difflib.SequenceMatcher(
+            None, row["baseline"].pop("raw_text"), row["preprocessed"].pop("raw_text")
+        ).ratio(), 4)
+        row["verdict_changed"] = row["baseline"]["verdict"] != row["preprocessed"]["verdict"]
+        rows.append(row)
+        print(f"{row['file']}: {row['baseline']['seconds']}s -> {row['preprocessed']['seconds']}s, "
+              f"문자 일치율 {row['text_similarity']}, 판정 변경 {row['verdict_changed']}")
+
+    summary = {
+        "files": len(rows),
+        "baseline_seconds": round(sum(r["baseline"]["seconds"] for r in rows), 3),
+        "preprocessed_seconds": round(sum(r["preprocessed"]["seconds"] for r in rows), 3),
+        "mean_text_similarity": round(float(np.mean([r["text_similarity"] for r in rows])), 4) if rows else 0.0,
+        "verdict_changes": sum(r["verdict_changed"] for r in rows),
+        "mean_rule_score_delta": round(float(np.mean(
+            [r["preprocessed"]["rule_score"] - r["baseline"]["rule_score"] for r in rows]
+        )), 4) if rows else 0.0,
+        "options": tuned_options,
+    }
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump({"summary": summary, "files": rows}, f, ensure_ascii=False, indent=2)
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="OCR 전처리 전후 검증 시간/정확도 비교")
+    parser.add_argument("sample_dir", help="증명서 샘플(png/jpg/pdf)이 있는 폴더")
+    parser.add_argument("--output", default=None, help="결과를 저장할 JSON 경로")
+    args = parser.parse_args()
+    benchmark(args.sample_dir, args.output)
@@ -0,0 +1,116 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+VERIFY_CACHE_PATH = os.environ.get("VERIFY_CACHE_PATH", "./matching/verify_cache.db")
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def file_content_hash(path: str, chunk_size: int = 1024 * 1024) -> str:
+    # 큰 파일도 메모리에 다 올리지 않고 content_hash와 같은 값을 낸다
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def verification_summary(result: dict) -> dict:
+    # 캐시와 응답에 쓰는 검증 결과 요약. raw_text 같은 큰 값은 남기지 않는다
+    return {
+        "is_verified": bool(result["verdict"]),
+        "rule_score": result.get("rule_score", 0.0),
+        "keyword_hits": result.get("keyword_hit_count", 0),
+    }
+
+
+class VerificationCache:
+    # (파일 내용 sha256, 검증기 버전) -> 검증 결과. 같은 파일을 다시 올리면 OCR/MPNet을 건너뛴다
+    def __init__(self, path: str = VERIFY_CACHE_PATH, max_entries: int = 10000):
+        self.path = path
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.conn = None
+        self.hits = 0
+        self.misses = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self.conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self.conn = sqlite3.connect(self.path, check_same_thread=False)
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS verification_cache (
+                    content_hash TEXT NOT NULL,
+                    version TEXT NOT NULL,
+                    result TEXT NOT NULL,
+                    used_at REAL NOT NULL,
+                    PRIMARY KEY (content_hash, version)
+                )
+            """)
+            self.conn.execute("CREATE INDEX IF NOT EXISTS ix_verification_cache_used_at ON verification_cache (used_at)")
+            self.conn.commit()
+        return self.conn
+
+    def get(self, digest: str, version: str) -> dict | None:
+        with self.lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT result FROM verification_cache WHERE content_hash = ? AND version = ?",
+                (digest, version)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            conn.execute(
+                "UPDATE verification_cache SET used_at = ? WHERE content_hash = ? AND version = ?",
+                (time.time(), digest, version)
+            )
+            conn.commit()
+            self.hits += 1
+            return json.loads(row[0])
+
+    def set(self, digest: str, version: str, result: dict):
+        with self.lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO verification_cache (content_hash, version, result, used_at) VALUES (?, ?, ?, ?)",
+                (digest, version, json.dumps(result, ensure_ascii=False), time.time())
+            )
+            # 가장 오래 쓰이지 않은 항목부터 지워 max_entries를 넘지 않게 한다
+            conn.execute("""
+                DELETE FROM verification_cache WHERE rowid IN (
+                    SELECT rowid FROM verification_cache ORDER BY used_at DESC LIMIT -1 OFFSET ?
+                )
+            """, (self.max_entries,))
+            conn.commit()
+
+    def purge_other_versions(self, version: str) -> int:
+        # 임계값이나 참조 문장이 바뀌면 이전 버전 결과는 다시 쓰일 일이 없다
+        with self.lock:
+            conn = self._connect()
+            deleted = conn.execute("DELETE FROM verification_cache WHERE version != ?", (version,)).rowcount
+            conn.commit()
+            return deleted
+
+    def stats(self) -> dict:
+        with self.lock:
+            size = self._connect().execute("SELECT COUNT(*) FROM verification_cache").fetchone()[0]
+            total = self.hits + self.misses
+            return {
+                "size": size,
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
+
+
+verification_cache = VerificationCache()
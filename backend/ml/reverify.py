@@ -0,0 +1,174 @@
+import argparse
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from sqlalchemy import bindparam, update
+
+from ..database import SessionLocal
+from .. import models
+from . import jobs
+from .result_cache import verification_cache, file_content_hash
+
+CHECKPOINT_PATH = "./matching/reverify_checkpoint.json"
+
+
+def _worker_version(base_threshold: float) -> str:
+    # 워커에 올라간 검증기 기준의 버전. 부모 프로세스는 모델을 올리지 않는다
+    return jobs._worker_verifier.version(base_threshold=base_threshold)
+
+
+def load_checkpoint(path: str, version: str) -> dict:
+    # {user_id: 검증한 파일 sha256}. 검증기 버전이 바뀌었으면 처음부터 다시 한다
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, encoding="utf-8") as f:
+            checkpoint = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"체크포인트 읽기 실패, 처음부터 시작합니다: {e}")
+        return {}
+    if checkpoint.get("version") != version:
+        print("검증기 설정이 바뀌어 체크포인트를 무시합니다.")
+        return {}
+    return checkpoint.get("done", {})
+
+
+def save_checkpoint(path: str, version: str, done: dict):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"version": version, "done": done}, f)
+    os.replace(tmp_path, path)
+
+
+def write_results(rows: list, dry_run: bool = False):
+    # 한 트랜잭션에 chunk 하나를 반영한다. 그 사이 증명서를 다시 올린 사용자는 경로가 달라 건너뛴다
+    if dry_run or not rows:
+        return
+    statement = (
+        update(models.User.__table__)
+        .where(models.User.__table__.c.id == bindparam("user_id"))
+        .where(models.User.__table__.c.certificate_path == bindparam("file_path"))
+        .values(is_verified=bindparam("is_verified"))
+    )
+    db = SessionLocal()
+    try:
+        db.execute(statement, rows)
+        db.commit()
+    finally:
+        db.close()
+
+
+def stored_certificates() -> list:
+    db = SessionLocal()
+    try:
+        return db.query(models.User.id, models.User.certificate_path, models.User.is_verified).filter(
+            models.User.certificate_path.isnot(None)
+        ).order_by(models.User.id).all()
+    finally:
+        db.close()
+
+
+def reverify(workers: int = jobs.VERIFY_WORKERS, chunk_size: int = 200, checkpoint_path: str = CHECKPOINT_PATH,
+             base_threshold: float = 0.70, similarity_threshold: float = 0.70, restart: bool = False,
+             dry_run: bool = False) -> dict:
+    started = time.perf_counter()
+    counts = {"total": 0, "checkpoint": 0, "cached": 0, "verified": 0, "changed": 0, "missing": 0, "failed": 0}
+
+    # 서버의 비동기 검증과 같은 워커 초기화/검증 함수를 쓴다
+    executor = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=jobs._init_worker,
+        initargs=(similarity_threshold,),
+    )
+    try:
+        version = executor.submit(_worker_version, base_threshold).result()
+        done = {} if restart else load_checkpoint(checkpoint_path, version)
+        certificates = stored_certificates()
+        counts["total"] = len(certificates)
+        print(f"검증기 버전 {version}, 대상 {len(certificates)}건 (체크포인트 {len(done)}건)")
+
+        rows, in_flight = [], {}
+
+        def record(user_id: int, file_path: str, old_verified: bool, digest: str, summary: dict):
+            rows.append({"user_id": user_id, "file_path": file_path, "is_verified": summary["is_verified"]})
+            done[str(user_id)] = digest
+            if bool(old_verified) != summary["is_verified"]:
+                counts["changed"] += 1
+            if len(rows) >= chunk_size:
+                flush()
+
+        def flush():
+            # DB에 반영한 뒤에 체크포인트를 남겨, 중간에 끊겨도 반영 안 된 결과를 건너뛰지 않게 한다
+            nonlocal rows
+            write_results(rows, dry_run)
+            if not dry_run:
+                save_checkpoint(checkpoint_path, version, done)
+            rows = []
+
+        def collect(finished):
+            for future in finished:
+                user_id, file_path, old_verified, digest = in_flight.pop(future)
+                try:
+                    summary, _ = future.result()
+                except BrokenProcessPool:
+                    # 워커가 죽으면 남은 작업도 모두 실패하므로 멈추고, 다음 실행에서 이어 간다
+                    raise
+                except Exception as e:
+                    counts["failed"] += 1
+                    print(f"검증 실패 (user {user_id}, {file_path}): {e}")
+                    continue
+                verification_cache.set(digest, version, summary)
+                counts["verified"] += 1
+                record(user_id, file_path, old_verified, digest, summary)
+
+        try:
+            for user_id, file_path, old_verified in certificates:
+                if not os.path.exists(file_path):
+                    counts["missing"] += 1
+                    continue
+                digest = file_content_hash(file_path)
+                if done.get(str(user_id)) == digest:
+                    counts["checkpoint"] += 1
+                    continue
+                # 내용이 같은 파일을 같은 설정으로 이미 검증했다면 OCR/MPNet을 건너뛴다
+                summary = verification_cache.get(digest, version)
+                if summary is not None:
+                    counts["cached"] += 1
+                    record(user_id, file_path, old_verified, digest, summary)
+                    continue
+
+                # 해시를 계산하는 동안 워커가 놀지 않을 만큼만 앞서 제출해 둔다
+                while len(in_flight) >= workers * 2:
+                    finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    collect(finished)
+                future = executor.submit(jobs._verify, file_path, base_threshold)
+                in_flight[future] = (user_id, file_path, old_verified, digest)
+
+            while in_flight:
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                collect(finished)
+        finally:
+            # 중간에 멈춰도 끝난 결과까지는 반영해 둔다
+            flush()
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    counts["seconds"] = round(time.perf_counter() - started, 2)
+    print(json.dumps(counts, ensure_ascii=False))
+    return counts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="저장된 증명서 전체 재검증 (임계값/키워드/참조 문장 변경 후)")
+    parser.add_argument("--workers", type=int, default=jobs.VERIFY_WORKERS)
+    parser.add_argument("--chunk-size", type=int, default=200, help="한 트랜잭션에 반영할 사용자 수")
+    parser.add_argument("--checkpoint", default=CHECKPOINT_PATH)
+    parser.add_argument("--restart", action="store_true", help="체크포인트를 무시하고 처음부터")
+    parser.add_argument("--dry-run", action="store_true", help="DB와 체크포인트는 건드리지 않고 결과만 센다")
+    args = parser.parse_args()
+    reverify(args.workers, args.chunk_size, args.checkpoint, restart=args.restart, dry_run=args.dry_run)
@@ -0,0 +1,34 @@
+import hashlib
+import json
+import os
+from .preprocess import DEFAULT_PREPROCESS
+
+# 증명서 검증 설정. torch 없이 import 되므로 API 프로세스는 모델을 올리지 않고도 검증기 버전을 알 수 있다
+
+MPNET_MODEL_NAME = "sentence-transformers/all-mpnet-base-v2"
+MPNET_BACKEND = os.environ.get("MPNET_BACKEND", "torch")
+
+# 검증 로직이 바뀌어 이전 결과를 재사용하면 안 될 때 올린다
+VERIFIER_VERSION = "1"
+
+KEYWORDS = ["보육교사", "보육", "영유아보육법", "보육교사자격증", "유치원", "유아교육법", "교육법", "유아", "영유아"]
+REFERENCES = [
+    "보육교사", "영유아보육법에 따라 보육교사의", "보육교사 1급",
+    "보육교사 2급", "보육교사 3급", "교원 자격증", "교육부장관"
+]
+# 규칙마다 모든 묶음에서 문구가 하나 이상 그대로 나오면 MPNet 없이 통과시킨다
+STRONG_EVIDENCE = [
+    [["보육교사 1급", "보육교사 2급", "보육교사 3급"], ["영유아보육법"]],
+]
+
+
+def verifier_version(backend: str = MPNET_BACKEND, similarity_threshold: float = 0.70, base_threshold: float = 0.70,
+                     preprocess: dict | None = None, short_circuit: bool = True, keywords: list = KEYWORDS,
+                     references: list = REFERENCES, strong_evidence: list = STRONG_EVIDENCE) -> str:
+    # 모델, 임계값, 키워드, 참조 문장 중 하나라도 바뀌면 값이 달라진다.
+    # 인자 기본값은 ChildcareDocumentClassifier 기본값과 같다
+    config = json.dumps([
+        VERIFIER_VERSION, MPNET_MODEL_NAME, backend, similarity_threshold, base_threshold, keywords, references,
+        {**DEFAULT_PREPROCESS, **(preprocess or {})}, short_circuit, strong_evidence
+    ], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(config.encode("utf-8")).hexdigest()[:16]
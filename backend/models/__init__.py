@@ -1,5 +1,6 @@
 from .user import User
 from .survey import UserSurvey, SitterProfile
+from .tag import Activity, Region, PayPeriod
 from .matching import Match
 from .review import Review
 from .block import Block
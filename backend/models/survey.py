@@ -18,6 +18,9 @@ class UserSurvey(Base):
 
     user = relationship("User", back_populates="survey")
 
+    activity_tags = relationship("Activity", secondary="survey_activities")
+    region_tags = relationship("Region", secondary="survey_regions")
+
     children = relationship("Child", back_populates="survey", cascade="all, delete-orphan") 
     
 class Child(Base):
@@ -59,4 +62,8 @@ class SitterProfile(Base):
     avg_safety_management = Column(Float, default=0.0)
     avg_communication_skill = Column(Float, default=0.0)
 
-    user = relationship("User", back_populates="sitter_profile")
\ No newline at end of file
+    user = relationship("User", back_populates="sitter_profile")
+
+    activity_tags = relationship("Activity", secondary="sitter_activities")
+    region_tags = relationship("Region", secondary="sitter_regions")
+    pay_period_tags = relationship("PayPeriod", secondary="sitter_pay_periods")
\ No newline at end of file
@@ -0,0 +1,55 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, Table
+from ..database import Base
+
+
+class Activity(Base):
+    __tablename__ = "activities"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, unique=True, nullable=False)
+
+
+class Region(Base):
+    __tablename__ = "regions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, unique=True, nullable=False)
+
+
+class PayPeriod(Base):
+    __tablename__ = "pay_periods"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, unique=True, nullable=False)
+
+
+# 돌보미/설문 <-> 태그 연결 테이블. 태그 id 쪽 인덱스로 "이 지역의 돌보미" 조회를 처리한다
+sitter_activities = Table(
+    "sitter_activities", Base.metadata,
+    Column("sitter_id", Integer, ForeignKey("sitter_profiles.id", ondelete="CASCADE"), primary_key=True),
+    Column("activity_id", Integer, ForeignKey("activities.id", ondelete="CASCADE"), primary_key=True, index=True),
+)
+
+sitter_regions = Table(
+    "sitter_regions", Base.metadata,
+    Column("sitter_id", Integer, ForeignKey("sitter_profiles.id", ondelete="CASCADE"), primary_key=True),
+    Column("region_id", Integer, ForeignKey("regions.id", ondelete="CASCADE"), primary_key=True, index=True),
+)
+
+sitter_pay_periods = Table(
+    "sitter_pay_periods", Base.metadata,
+    Column("sitter_id", Integer, ForeignKey("sitter_profiles.id", ondelete="CASCADE"), primary_key=True),
+    Column("pay_period_id", Integer, ForeignKey("pay_periods.id", ondelete="CASCADE"), primary_key=True, index=True),
+)
+
+survey_activities = Table(
+    "survey_activities", Base.metadata,
+    Column("survey_id", Integer, ForeignKey("user_surveys.id", ondelete="CASCADE"), primary_key=True),
+    Column("activity_id", Integer, ForeignKey("activities.id", ondelete="CASCADE"), primary_key=True, index=True),
+)
+
+survey_regions = Table(
+    "survey_regions", Base.metadata,
+    Column("survey_id", Integer, ForeignKey("user_surveys.id", ondelete="CASCADE"), primary_key=True),
+    Column("region_id", Integer, ForeignKey("regions.id", ondelete="CASCADE"), primary_key=True, index=True),
+)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, Float, DateTime
+from sqlalchemy import Column, Integer, String, Boolean, Float, DateTime, JSON
 from sqlalchemy.orm import relationship
 from ..database import Base
 from datetime import datetime
@@ -18,6 +18,8 @@ class User(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
 
     profile_image_path = Column(String, nullable=True)
+    # {"thumb"|"detail"|"full": {"webp": 경로, "src": JPEG 경로}}. 업로드 후 백그라운드에서 채운다
+    profile_image_variants = Column(JSON, nullable=True)
 
     survey = relationship("UserSurvey", back_populates="user", uselist=False)
     sitter_profile = relationship("SitterProfile", back_populates="user", uselist=False)
@@ -6,6 +6,8 @@ from ..database import SessionLocal
 from datetime import timedelta
 from ..database import SessionLocal
 from ..core.security import verify_password, create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES
+from ..core.sitter_index import sitter_index
+from ..core.cache import invalidate_sitters, invalidate_survey
 from datetime import datetime
 from pydantic import BaseModel
 
@@ -39,15 +41,15 @@ def signup(user:schemas.UserCreate,  db: Session = Depends(get_db)):
     if user.role == "parent":
         survey = models.UserSurvey(
             user_id=new_user.id,
-            hope_regions=", ".join(user.hope_regions) if isinstance(user.hope_regions, list) else user.hope_regions,
             region_detail=user.region_detail,
             hope_pay=user.hope_pay,
-            activities=", ".join(user.activities) if isinstance(user.activities, list) else user.activities,
             warning=user.warning,
             info_agree=user.info_agree
         )
         db.add(survey)
+        crud.set_survey_tags(db, survey, activities=user.activities or [], hope_regions=user.hope_regions or [])
         db.flush()
+        invalidate_survey(survey.id)
 
         if user.children_profiles:
             for child_data in user.children_profiles:
@@ -62,10 +64,7 @@ def signup(user:schemas.UserCreate,  db: Session = Depends(get_db)):
     elif user.role == "sitter":
         sitter = models.SitterProfile(
             user_id=new_user.id,
-            activities=", ".join(user.activities) if isinstance(user.activities, list) else user.activities,
-            regions=", ".join(user.hope_regions) if isinstance(user.hope_regions, list) else user.hope_regions,
             hourly_pay=user.hope_pay, 
-            pay_periods=", ".join(user.pay_period) if isinstance(user.pay_period, list) else user.pay_period,
             cctv_agree=user.cctv_agree,
             info_agree=user.info_agree,
 
@@ -75,11 +74,19 @@ def signup(user:schemas.UserCreate,  db: Session = Depends(get_db)):
             introduction=user.introduction
         )
         db.add(sitter)
+        crud.set_sitter_tags(
+            db, sitter,
+            activities=user.activities or [],
+            regions=user.hope_regions or [],
+            pay_periods=user.pay_period or []
+        )
 
     db.commit()
 
     rematch_prob = None
     if user.role == "sitter":
+        sitter_index.refresh_user(db, new_user.id)
+        invalidate_sitters()
         sitter_profile = db.query(models.SitterProfile).filter(models.SitterProfile.user_id == new_user.id).first()
         rematch_prob = sitter_profile.rematch_probability if sitter_profile else None
 
@@ -1,17 +1,25 @@
 import os
-from fastapi import APIRouter, UploadFile, File, Depends, HTTPException
+import time
+from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, Query, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import JSONResponse
+from jose import jwt
 from sqlalchemy.orm import Session
 from ..database import SessionLocal
-from ..core.security import get_current_user
+from ..core.security import get_current_user, SECRET_KEY, ALGORITHM
+from ..core.uploads import save_upload
 from .. import models
 from starlette.concurrency import run_in_threadpool
-from ..dependency import get_verifier
-from ..ml.document import ChildcareDocumentClassifier
+from ..dependency import get_verifier, model_status, state
 from ..schemas import CertificateUploadResponse
+from ..ml.jobs import verification_jobs, JobQueueFull
+from ..ml.result_cache import verification_cache, verification_summary
+from ..ml.metrics import stage_metrics
+from ..ml.verifier_config import verifier_version
 
 router = APIRouter(prefix="/certificate", tags=["Certificate"])
 
 UPLOAD_DIR = "uploads/certificates"
+MAX_CERTIFICATE_BYTES = 20 * 1024 * 1024
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
 def get_db():
@@ -24,9 +32,9 @@ def get_db():
 @router.post("/upload")
 async def upload_certification(
     file: UploadFile = File(...),
+    async_mode: bool = Query(False, description="True면 202와 job_id를 바로 돌려주고 백그라운드에서 검증"),
     db: Session = Depends(get_db),
-    current_user=Depends(get_current_user),
-    verifier: ChildcareDocumentClassifier = Depends(get_verifier)
+    current_user=Depends(get_current_user)
 ):
     allowed_extensions = {"png", "jpg", "jpeg", "pdf"}
     extension =  file.filename.split(".")[-1].lower()
@@ -37,38 +45,70 @@ async def upload_certification(
     filename = f"{current_user.id}_{file.filename}"
     file_path = os.path.join(UPLOAD_DIR, filename)
 
-    file_content = await file.read()
-    await run_in_threadpool(lambda: open(file_path, "wb").write(file_content))
+    started = time.perf_counter()
+    saved = await save_upload(file, file_path, MAX_CERTIFICATE_BYTES)
+    stage_metrics.observe("file_write", (time.perf_counter() - started) * 1000)
 
-    try:
-        verification_result = await run_in_threadpool(
-            verifier.classify_with_rules,
-            file_path=file_path,
-            base_threshold=0.70
-        )
-
-        is_verified = verification_result["verdict"]
-        rule_score = verification_result.get("rule_score", 0.0)
-        
-    except Exception as e:
-        print(f"문서 검증 중 오류 발생: {e}")
-        is_verified = False 
-        rule_score = 0.0
-
-        if os.path.exists(file_path):
-            os.remove(file_path)
-        raise HTTPException(status_code=500, detail="문서 처리 중 서버 오류가 발생했습니다.")
+    # 같은 파일을 같은 검증기 설정으로 이미 검증했다면 결과를 그대로 쓴다.
+    # 버전은 설정만으로 계산하므로 캐시 적중이나 비동기 검증에는 이 프로세스에 모델이 필요 없다
+    digest = saved["sha256"]
+    version = verifier_version(base_threshold=0.70)
+    summary = await run_in_threadpool(verification_cache.get, digest, version)
+    cached = summary is not None
+
+    if async_mode and not cached:
+        try:
+            job = verification_jobs.submit(current_user.id, file_path, base_threshold=0.70, cache_key=(digest, version))
+        except JobQueueFull:
+            if os.path.exists(file_path):
+                os.remove(file_path)
+            raise HTTPException(
+                status_code=503,
+                detail="검증 대기열이 가득 찼습니다. 잠시 후 다시 시도해주세요.",
+                headers={"Retry-After": "10"}
+            )
+        return JSONResponse(status_code=202, content={
+            "message": "증명서 업로드 완료, 검증 진행 중",
+            "job_id": job["job_id"],
+            "status": job["status"]
+        })
+
+    if not cached:
+        try:
+            verifier = await run_in_threadpool(get_verifier)
+        except HTTPException:
+            if os.path.exists(file_path):
+                os.remove(file_path)
+            raise
+        try:
+            verification_result = await run_in_threadpool(
+                verifier.classify_with_rules,
+                file_path=file_path,
+                base_threshold=0.70
+            )
+            summary = verification_summary(verification_result)
+            await run_in_threadpool(verification_cache.set, digest, version, summary)
 
+        except Exception as e:
+            print(f"문서 검증 중 오류 발생: {e}")
+
+            if os.path.exists(file_path):
+                os.remove(file_path)
+            raise HTTPException(status_code=500, detail="문서 처리 중 서버 오류가 발생했습니다.")
+
+    # get_current_user는 별도 세션에서 사용자를 읽어오므로, 이 요청의 세션으로 옮겨와야 commit에 반영된다
+    current_user = db.merge(current_user)
     current_user.certificate_path = file_path
-    current_user.is_verified = is_verified 
+    current_user.is_verified = summary["is_verified"]
     db.commit()
 
     return{
         "message": "증명서 업로드 및 검증 완료", 
         "file_path": file_path, 
-        "is_verified": is_verified,
-        "rule_score": rule_score,
-        "keyword_hits": verification_result.get("keyword_hit_count", 0)
+        "is_verified": summary["is_verified"],
+        "rule_score": summary["rule_score"],
+        "keyword_hits": summary["keyword_hits"],
+        "cached": cached
     }
 
 @router.get("/me")
@@ -82,4 +122,59 @@ def my_cert(current_user=Depends(get_current_user)):
         "certificate_registered": True,
         "certificate_path": current_user.certificate_path,
         "is_verified": current_user.is_verified
-    }
\ No newline at end of file
+    }
+
+@router.get("/stats")
+def get_verifier_stats(current_user=Depends(get_current_user)):
+    # 통계를 보려고 모델을 올리지는 않는다. 아직 올라오지 않았으면 검증기 쪽 값은 null로 둔다
+    verifier = state.get("verifier")
+    return {
+        "verifier": model_status["verifier"]["status"],
+        "encode_batcher": verifier.batcher.stats() if verifier else None,
+        "embedding_cache": verifier.embedding_cache.stats() if verifier else None,
+        "jobs": verification_jobs.stats(),
+        "result_cache": verification_cache.stats()
+    }
+
+
+def job_view(job: dict) -> dict:
+    return {key: value for key, value in job.items() if key not in ("user_id", "file_path", "cache_key")}
+
+
+@router.get("/jobs/{job_id}")
+def get_verification_job(job_id: str, current_user=Depends(get_current_user)):
+    job = verification_jobs.get(job_id)
+    if not job or job["user_id"] != current_user.id:
+        raise HTTPException(status_code=404, detail="검증 작업을 찾을 수 없습니다.")
+    return job_view(job)
+
+
+@router.websocket("/jobs/{job_id}/ws")
+async def watch_verification_job(websocket: WebSocket, job_id: str, token: str = Query(None)):
+    # 검증이 끝나면 결과를 한 번 보내고 연결을 닫는다
+    db = SessionLocal()
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM]) if token else {}
+        user = db.query(models.User).filter(models.User.email == payload.get("sub")).first()
+    except Exception:
+        user = None
+    finally:
+        db.close()
+
+    job = verification_jobs.get(job_id)
+    if user is None or job is None or job["user_id"] != user.id:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    try:
+        job = await verification_jobs.wait(job_id)
+        await websocket.send_json(job_view(job))
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+
+
+@router.get("/metrics")
+def get_verification_metrics(current_user=Depends(get_current_user)):
+    return stage_metrics.snapshot()
@@ -4,6 +4,9 @@ from datetime import datetime
 from ..database import SessionLocal
 from .. import models
 from ..core.security import get_current_user
+from ..core.match_engine import WEIGHTS, split_tokens, load_survey_rows
+from ..core.sitter_index import sitter_index
+from ..core.cache import recommend_cache, recommend_cache_key
 
 router = APIRouter(prefix="/match", tags=["Matching"])
 
@@ -52,24 +55,27 @@ def get_recent_sitter_matches(
 
 
 def calculate_match_score(user_survey, sitter):
-    user_activities = set(user_survey.activities) 
-    sitter_activities = set(sitter.activities)
+    user_activities = set(split_tokens(user_survey.activities))
+    sitter_activities = set(split_tokens(sitter.activities))
     activity_score = len(user_activities.intersection(sitter_activities)) / max(1, len(user_activities))
 
-    user_regions = set(user_survey.hope_regions) 
-    sitter_regions = set(sitter.regions) 
+    user_regions = set(split_tokens(user_survey.hope_regions))
+    sitter_regions = set(split_tokens(sitter.regions))
     region_score = len(user_regions.intersection(sitter_regions)) / max(1, len(user_regions))
 
-    pay_score = 1 if sitter.hourly_pay >= user_survey.hope_pay else 0
-    pay_period_score = 1 if user_survey.pay_period in sitter.pay_periods else 0
-    cctv_score = 1 if user_survey.cctv_agree == sitter.cctv_agree else 0
+    pay_period = getattr(user_survey, "pay_period", None)
+    cctv_agree = getattr(user_survey, "cctv_agree", None)
+
+    pay_score = 1 if (sitter.hourly_pay or 0) >= (user_survey.hope_pay or 0) else 0
+    pay_period_score = 1 if pay_period and pay_period in split_tokens(sitter.pay_periods) else 0
+    cctv_score = 1 if cctv_agree == sitter.cctv_agree else 0
 
     total_score = (
-        0.4 * activity_score +
-        0.3 * region_score +
-        0.1 * pay_score +
-        0.1 * pay_period_score +
-        0.1 * cctv_score
+        WEIGHTS["activity"] * activity_score +
+        WEIGHTS["region"] * region_score +
+        WEIGHTS["pay"] * pay_score +
+        WEIGHTS["pay_period"] * pay_period_score +
+        WEIGHTS["cctv"] * cctv_score
     )
 
     return round(total_score, 3)
@@ -79,31 +85,25 @@ def recommend_sitters(survey_id: int,
     db: Session = Depends(get_db),
     current_user=Depends(get_current_user)):
 
-    user_survey = db.query(models.UserSurvey).filter(models.UserSurvey.id == survey_id).first()
-    if not user_survey:
-        raise HTTPException(status_code=404, detail="설문지를 찾을 수 없습니다.")
-    
-    blocked_ids = db.query(models.Block.blocked_id).filter(
-        models.Block.blocker_id == current_user.id
-    ).subquery()
+    cache_key = recommend_cache_key(survey_id, current_user.id)
+    top_matches = recommend_cache.get(cache_key)
 
-    sitters = db.query(models.SitterProfile).join(models.User).filter(
-        models.User.id.notin_(blocked_ids)
-    ).all()
-    
-    if not sitters:
-        raise HTTPException(status_code=404, detail="추천할 수 있는 돌보미가 없습니다.")
-
-    scored = []
-    for sitter in sitters:
-        score = calculate_match_score(user_survey, sitter)
-        scored.append({
-            "sitter_id": sitter.id,
-            "name": sitter.user.name if sitter.user else None,
-            "score": score
-        })
-    
-    top_matches = sorted(scored, key=lambda x: x["score"], reverse=True)[:6]
+    if top_matches is None:
+        surveys = load_survey_rows(db, [survey_id])
+        if not surveys:
+            raise HTTPException(status_code=404, detail="설문지를 찾을 수 없습니다.")
+        user_survey = surveys[0]
+
+        blocked_ids = {
+            blocked_id for (blocked_id,) in db.query(models.Block.blocked_id).filter(
+                models.Block.blocker_id == current_user.id
+            )
+        }
+        top_matches = sitter_index.recommend(db, user_survey, k=6, exclude_user_ids=blocked_ids)
+
+        if not top_matches:
+            raise HTTPException(status_code=404, detail="추천할 수 있는 돌보미가 없습니다.")
+        recommend_cache.set(cache_key, top_matches)
 
     return {
         "survey_id": survey_id,
@@ -111,6 +111,11 @@ def recommend_sitters(survey_id: int,
     }
 
 
+@router.get("/recommend-cache/stats")
+def get_recommend_cache_stats(current_user=Depends(get_current_user)):
+    return recommend_cache.stats()
+
+
 @router.get("/sitter/list")
 def get_sitter_match_list(
     filter_status: str = "all", 
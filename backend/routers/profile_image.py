@@ -1,13 +1,17 @@
 import os
-from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, status
+from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, BackgroundTasks, status
 from sqlalchemy.orm import Session
 from ..database import SessionLocal
 from ..core.security import get_current_user
 from .. import models
+from ..core.cache import invalidate_search
+from ..core.uploads import save_upload
+from ..core.thumbnails import generate_profile_variants, remove_variants
 
 router = APIRouter(prefix="/profile/image", tags=["Profile Image"])
 
 UPLOAD_DIR = "uploads/profile_images"
+MAX_PROFILE_IMAGE_BYTES = 10 * 1024 * 1024
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
 def get_db():
@@ -19,6 +23,7 @@ def get_db():
 
 @router.post("/upload")
 async def upload_profile_image(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(..., description="돌보미 선생님 프로필 사진"),
     db: Session = Depends(get_db),
     current_user=Depends(get_current_user)
@@ -39,13 +44,21 @@ async def upload_profile_image(
     file_path = os.path.join(UPLOAD_DIR, filename)
 
     try:
-        with open(file_path, "wb") as buffer:
-            buffer.write(await file.read())
-    except Exception as e:
+        saved = await save_upload(file, file_path, MAX_PROFILE_IMAGE_BYTES)
+    except OSError as e:
         raise HTTPException(status_code=500, detail=f"파일 저장 중 오류 발생: {e}")
     
+    # get_current_user는 별도 세션에서 사용자를 읽어오므로, 이 요청의 세션으로 옮겨와야 commit에 반영된다
+    current_user = db.merge(current_user)
+    # 이전 사진의 크기별 변환본은 더 이상 쓰지 않는다. 새 변환본이 준비될 때까지는 원본을 내려준다
+    old_variants = current_user.profile_image_variants
     current_user.profile_image_path = file_path
+    current_user.profile_image_variants = None
     db.commit()
+    invalidate_search()
+
+    background_tasks.add_task(remove_variants, old_variants)
+    background_tasks.add_task(generate_profile_variants, current_user.id, file_path, saved["sha256"][:16])
 
     return {"message": "프로필 사진 업로드 완료", "file_path": file_path}
 
@@ -59,5 +72,6 @@ def get_my_profile_image(current_user=Depends(get_current_user)):
         }
     return {
         "image_registered": True,
-        "profile_image_path": current_user.profile_image_path
+        "profile_image_path": current_user.profile_image_path,
+        "variants": current_user.profile_image_variants
     }
\ No newline at end of file
@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 from ..database import SessionLocal
 from .. import models, schemas
 from ..core.security import get_current_user
+from ..core.cache import bump_block_version
 from typing import List
 
 router = APIRouter(prefix="/report", tags=["Report & Block"])
@@ -81,6 +82,7 @@ def block_user_on_report(blocker_id: int, blocked_id: int, db: Session):
     new_block = models.Block(blocker_id=blocker_id, blocked_id=blocked_id)
     db.add(new_block)
     db.commit()
+    bump_block_version(blocker_id)
     return new_block
 
 @router.post("/block/{blocked_id}", response_model=schemas.BlockResponse, status_code=status.HTTP_201_CREATED)
@@ -123,6 +125,7 @@ def unblock_user(
     
     db.delete(block_entry)
     db.commit()
+    bump_block_version(current_user.id)
     return {"message": "차단이 해제되었습니다."}
 
 @router.get("/blocks", response_model=List[schemas.BlockResponse])
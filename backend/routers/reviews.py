@@ -3,11 +3,12 @@ from sqlalchemy.orm import Session
 from ..database import SessionLocal
 from .. import models, schemas
 from datetime import datetime
-from ..ml.model_load import MODEL_OBJECT
+from ..ml.model_load import load_prediction_model
 import pandas as pd
 import numpy as np
 from sqlalchemy import func
 from ..core.security import get_current_user
+from ..core.cache import invalidate_search
 
 router = APIRouter(prefix="/review", tags=["Review"])
 
@@ -35,7 +36,7 @@ def determine_caregiver_group(scores: dict) -> int:
     
 def calculate_rematch_probability(sitter_id: int, db: Session, review_scores: dict, caregiver_group: int) -> float:
     
-    model = MODEL_OBJECT
+    model = load_prediction_model()
     if model is None:
         return 100.0 
 
@@ -160,6 +161,7 @@ def create_review(review: schemas.ReviewCreate, db: Session = Depends(get_db)):
         pass
 
     db.commit()
+    invalidate_search()
     db.refresh(new_review)
 
     return new_review
@@ -236,6 +238,7 @@ def update_review(
             pass
 
     db.commit()
+    invalidate_search()
     db.refresh(existing_review)
 
     return existing_review
\ No newline at end of file
@@ -1,12 +1,31 @@
+import base64
+import json
 from fastapi import APIRouter, Depends, Query, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, case, func, literal, or_, select, union_all
+from sqlalchemy.orm import Session, contains_eager
 from typing import Optional, List
 from ..database import SessionLocal
 from .. import models, dependency
+from ..models import tag
 from ..core.security import get_current_user
+from ..core import fts
+from ..core.cache import search_cache
+from ..core.thumbnails import profile_image_variant
 
 router = APIRouter(prefix="/search", tags=["search"])
 
+SEARCH_PAGE_SIZE = 20
+SEARCH_MAX_PAGE_SIZE = 100
+
+# 시급 facet 구간 (이상, 미만)
+PAY_BUCKETS = [
+    ("~9,999", None, 10000),
+    ("10,000~11,999", 10000, 12000),
+    ("12,000~14,999", 12000, 15000),
+    ("15,000~19,999", 15000, 20000),
+    ("20,000~", 20000, None),
+]
+
 def get_db():
     db = SessionLocal()
     try:
@@ -14,33 +33,74 @@ def get_db():
     finally:
         db.close()
 
-@router.get("")
-def search_sitter(
-    activities: Optional[str] = Query(None),
-    regions: Optional[str] = Query(None),
-    min_pay: Optional[int] = Query(None),
-    max_pay: Optional[int] = Query(None),
-    cctv_agree: Optional[bool] = Query(None),
-    sort_by: Optional[str] = Query("hourly_pay"),
-    db: Session = Depends(get_db),
-    current_user: Optional[models.User] = Depends(dependency.get_current_user_optional)
-):
+def sitters_with_tag(db: Session, link_table, tag_column: str, tag_model, keyword: str):
+    # 태그 사전(수십 행)에서 부분 일치하는 태그를 찾고, 연결 테이블 인덱스로 돌보미를 고른다
+    tag_ids = [tag_id for (tag_id,) in db.query(tag_model.id).filter(tag_model.name.contains(keyword, autoescape=True))]
+    return select(link_table.c.sitter_id).where(link_table.c[tag_column].in_(tag_ids))
+
+def encode_cursor(sort_by: str, key, last_id: int) -> str:
+    raw = json.dumps([sort_by, key, last_id], ensure_ascii=False).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str, sort_by: str) -> tuple:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cursor_sort, key, last_id = json.loads(raw)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="잘못된 페이지 커서입니다.")
+    if cursor_sort != sort_by or not isinstance(last_id, int):
+        raise HTTPException(status_code=400, detail="정렬 기준이 바뀌어 커서를 사용할 수 없습니다.")
+    return key, last_id
+
+def sort_key(sort_by: str, match_query: str | None):
+    # (정렬 컬럼, 내림차순 여부). 동점은 항상 sitter id 오름차순으로 끊는다
+    if sort_by == "hourly_pay":
+        return models.SitterProfile.hourly_pay, True
+    if sort_by == "name":
+        return models.User.name, False
+    if sort_by == "relevance" and match_query:
+        return fts.bm25_rank(), False
+    return models.SitterProfile.id, False
+
+def after_cursor(key_column, descending: bool, key, last_id: int):
+    sitter_id = models.SitterProfile.id
+    if descending:
+        # 시급 내림차순은 NULL이 마지막에 온다
+        if key is None:
+            return and_(key_column.is_(None), sitter_id > last_id)
+        return or_(key_column < key, and_(key_column == key, sitter_id > last_id), key_column.is_(None))
+    return or_(key_column > key, and_(key_column == key, sitter_id > last_id))
+
+def normalize_keyword(value: str | None) -> str | None:
+    if value is None:
+        return None
+    return " ".join(value.split()).lower() or None
+
+def filtered_sitters(db: Session, activities, regions, min_pay, max_pay, cctv_agree):
     query = db.query(models.SitterProfile).join(models.User)
 
-    if current_user:
-        blocked_ids = db.query(models.Block.blocked_id).filter(
-            models.Block.blocker_id == current_user.id
-        ).subquery()
-        query = query.filter(models.User.id.notin_(blocked_ids))
+    match_query, tag_keywords = None, []
+    if activities and fts.fts_enabled(db):
+        terms, tag_keywords = fts.split_terms(activities)
+        match_query = fts.build_match_query(terms)
+    elif activities:
+        # FTS5를 쓸 수 없는 DB에서는 태그 사전 부분 일치로 검색
+        tag_keywords = [activities]
 
-    if activities:
-        query = query.filter(
-            (models.SitterProfile.activities.like(f"%{activities}%")) | 
-            (models.SitterProfile.regions.like(f"%{activities}%"))
+    if match_query:
+        query = query.join(fts.sitter_fts, fts.sitter_fts.c.rowid == models.SitterProfile.id).filter(
+            fts.match_clause(match_query)
         )
+    for keyword in tag_keywords:
+        query = query.filter(or_(
+            models.SitterProfile.id.in_(sitters_with_tag(db, tag.sitter_activities, "activity_id", models.Activity, keyword)),
+            models.SitterProfile.id.in_(sitters_with_tag(db, tag.sitter_regions, "region_id", models.Region, keyword))
+        ))
 
     if regions:
-        query = query.filter(models.SitterProfile.regions.like(f"%{regions}%"))
+        query = query.filter(
+            models.SitterProfile.id.in_(sitters_with_tag(db, tag.sitter_regions, "region_id", models.Region, regions))
+        )
 
     if min_pay is not None:
         query = query.filter(models.SitterProfile.hourly_pay >= min_pay)
@@ -50,14 +110,81 @@ def search_sitter(
     if cctv_agree is not None:
         query = query.filter(models.SitterProfile.cctv_agree == cctv_agree)
 
-    if sort_by == "hourly_pay":
-        query = query.order_by(models.SitterProfile.hourly_pay.desc())
-    elif sort_by == "name":
-        query = query.order_by(models.User.name.asc())
+    return query, match_query
+
+def pay_bucket():
+    hourly_pay = models.SitterProfile.hourly_pay
+    whens = []
+    for label, low, high in PAY_BUCKETS:
+        conditions = []
+        if low is not None:
+            conditions.append(hourly_pay >= low)
+        if high is not None:
+            conditions.append(hourly_pay < high)
+        whens.append((and_(*conditions), label))
+    return case(*whens, else_="unknown")
+
+def facet_counts(db: Session, sitter_ids) -> dict:
+    # 지역/활동/시급 구간/CCTV별 돌보미 수를 UNION ALL 집계 한 번으로 구한다
+    region_counts = select(literal("regions"), models.Region.name, func.count()).join(
+        tag.sitter_regions, tag.sitter_regions.c.region_id == models.Region.id
+    ).where(tag.sitter_regions.c.sitter_id.in_(sitter_ids)).group_by(models.Region.name)
+
+    activity_counts = select(literal("activities"), models.Activity.name, func.count()).join(
+        tag.sitter_activities, tag.sitter_activities.c.activity_id == models.Activity.id
+    ).where(tag.sitter_activities.c.sitter_id.in_(sitter_ids)).group_by(models.Activity.name)
+
+    bucket = pay_bucket()
+    pay_counts = select(literal("pay"), bucket, func.count()).where(
+        models.SitterProfile.id.in_(sitter_ids)
+    ).group_by(bucket)
 
-    sitters = query.all()
+    cctv = case(
+        (models.SitterProfile.cctv_agree.is_(True), "true"),
+        (models.SitterProfile.cctv_agree.is_(False), "false"),
+        else_="unknown"
+    )
+    cctv_counts = select(literal("cctv"), cctv, func.count()).where(
+        models.SitterProfile.id.in_(sitter_ids)
+    ).group_by(cctv)
 
-    return [
+    facets = {"regions": {}, "activities": {}, "pay": {}, "cctv": {}}
+    for facet, value, count in db.execute(union_all(region_counts, activity_counts, pay_counts, cctv_counts)):
+        facets[facet][value] = count
+    return facets
+
+def subtract_facets(facets: dict, removed: dict) -> dict:
+    return {
+        facet: {value: count - removed[facet].get(value, 0) for value, count in counts.items()
+                if count - removed[facet].get(value, 0) > 0}
+        for facet, counts in facets.items()
+    }
+
+def search_page(db: Session, filters: tuple, sort_by, limit: int, cursor, include_total: bool, with_facets: bool) -> dict:
+    query, match_query = filtered_sitters(db, *filters)
+
+    total = query.order_by(None).count() if include_total else None
+    facets = facet_counts(db, query.with_entities(models.SitterProfile.id).order_by(None)) if with_facets else None
+    query = query.options(contains_eager(models.SitterProfile.user))
+
+    key_column, descending = sort_key(sort_by, match_query)
+    if cursor:
+        key, last_id = decode_cursor(cursor, sort_by)
+        query = query.filter(after_cursor(key_column, descending, key, last_id))
+
+    query = query.add_columns(key_column.label("sort_key")).order_by(
+        key_column.desc().nulls_last() if descending else key_column.asc(),
+        models.SitterProfile.id.asc()
+    )
+    rows = query.limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last_sitter, last_key = rows[-1]
+        next_cursor = encode_cursor(sort_by, last_key, last_sitter.id)
+
+    items = [
         {
             "user_id": s.user_id,
             "name": s.user.name if s.user else "알 수 없음",
@@ -67,11 +194,74 @@ def search_sitter(
             "pay_periods": s.pay_periods,
             "cctv_agree": s.cctv_agree,
             "rematch_probability": s.rematch_probability,
-            "profile_image": s.user.profile_image_path if s.user else None
+            "profile_image": s.user.profile_image_path if s.user else None,
+            "profile_thumbnail": profile_image_variant(s.user, "thumb")
         }
-        for s in sitters
+        for s, _ in rows
     ]
 
+    page = {"items": items, "next_cursor": next_cursor, "total": total}
+    if with_facets:
+        page["facets"] = facets
+    return page
+
+@router.get("")
+def search_sitter(
+    activities: Optional[str] = Query(None),
+    regions: Optional[str] = Query(None),
+    min_pay: Optional[int] = Query(None),
+    max_pay: Optional[int] = Query(None),
+    cctv_agree: Optional[bool] = Query(None),
+    sort_by: Optional[str] = Query("hourly_pay"),
+    limit: int = Query(SEARCH_PAGE_SIZE, ge=1, le=SEARCH_MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    include_total: bool = Query(False),
+    facets: bool = Query(False),
+    db: Session = Depends(get_db),
+    current_user: Optional[models.User] = Depends(dependency.get_current_user_optional)
+):
+    filters = (normalize_keyword(activities), normalize_keyword(regions), min_pay, max_pay, cctv_agree)
+
+    # 차단 목록을 적용하기 전 페이지를 캐시해 비로그인/로그인 사용자가 같은 항목을 공유한다
+    cache_key = (filters, sort_by, limit, cursor, include_total, facets)
+    page = search_cache.get(cache_key)
+    if page is None:
+        page = search_page(db, filters, sort_by, limit, cursor, include_total, facets)
+        search_cache.set(cache_key, page)
+
+    if not current_user:
+        return page
+
+    blocked_ids = {
+        blocked_id for (blocked_id,) in db.query(models.Block.blocked_id).filter(
+            models.Block.blocker_id == current_user.id
+        )
+    }
+    if not blocked_ids:
+        return page
+
+    # 차단한 돌보미를 걸러낸 만큼 페이지가 짧아질 수 있지만 next_cursor는 그대로 유효하다
+    total = page["total"]
+    if total is not None or facets:
+        query, _ = filtered_sitters(db, *filters)
+        blocked_query = query.filter(models.User.id.in_(blocked_ids)).order_by(None)
+    if total is not None:
+        total -= blocked_query.count()
+
+    filtered = {
+        "items": [item for item in page["items"] if item["user_id"] not in blocked_ids],
+        "next_cursor": page["next_cursor"],
+        "total": total
+    }
+    if facets:
+        removed = facet_counts(db, blocked_query.with_entities(models.SitterProfile.id))
+        filtered["facets"] = subtract_facets(page["facets"], removed)
+    return filtered
+
+@router.get("/cache/stats")
+def get_search_cache_stats():
+    return search_cache.stats()
+
 from fastapi import HTTPException # 상단에 없다면 추가 필요
 
 @router.get("/sitter/{user_id}")
@@ -97,6 +287,7 @@ def get_sitter_detail(user_id: int, db: Session = Depends(get_db)):
         "availableDays": profile.pay_periods,
         "cctv": profile.cctv_agree,
         "introduction": profile.introduction,
+        "profileImage": profile_image_variant(sitter_user, "detail"),
         
         "rematchProbability": profile.rematch_probability, 
         "reviewStats": {
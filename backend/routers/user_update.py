@@ -1,9 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import Union
-from .. import schemas, models
+from .. import schemas, models, crud
 from ..database import SessionLocal
 from ..core.security import get_current_user
+from ..core.sitter_index import sitter_index
+from ..core.cache import invalidate_sitters, invalidate_survey
 
 router = APIRouter(prefix="/user", tags=["User Update"])
 
@@ -53,6 +55,11 @@ def read_users(db: Session = Depends(get_db), current_user: models.User = Depend
 
     return user_info
 
+def sent_fields(data) -> dict:
+    # Depends() 쿼리 스키마는 보내지 않은 항목도 None으로 채워 exclude_unset으로는 걸러지지 않는다.
+    # None인 항목은 보내지 않은 것으로 보고 기존 값과 태그를 그대로 둔다
+    return {key: value for key, value in data.model_dump(exclude_unset=True).items() if value is not None}
+
 @router.put("/update", response_model=schemas.UserResponse)
 def update_my_profile(
     user_data: schemas.UserUpdate = Depends(), 
@@ -62,7 +69,10 @@ def update_my_profile(
     current_user: models.User = Depends(get_current_user) 
 ):
     
-    user_update_data = user_data.model_dump(exclude_unset=True) 
+    # get_current_user는 별도 세션에서 사용자를 읽어오므로, 태그 연결이 같은 세션에서 이뤄지도록 옮겨온다
+    current_user = db.merge(current_user)
+
+    user_update_data = sent_fields(user_data)
     
     for key, value in user_update_data.items():
         setattr(current_user, key, value)
@@ -72,9 +82,9 @@ def update_my_profile(
         raise HTTPException(status_code=404, detail="사용자 프로필/설문 정보를 찾을 수 없습니다.")
     
     if current_user.role == "parent":
-        profile_update_data = parent_survey_data.model_dump(exclude_unset=True)
+        profile_update_data = sent_fields(parent_survey_data)
 
-        if 'children_profiles' in profile_update_data and profile_update_data['children_profiles'] is not None:
+        if 'children_profiles' in profile_update_data:
             new_children = profile_update_data.pop('children_profiles')
             profile.children.clear() 
             db.flush()
@@ -88,6 +98,12 @@ def update_my_profile(
                 )
                 db.add(new_child)
 
+        crud.set_survey_tags(
+            db, profile,
+            activities=profile_update_data.pop('activities', None),
+            hope_regions=profile_update_data.pop('hope_regions', None)
+        )
+
         for key, value in profile_update_data.items():
 
             if isinstance(value, list):
@@ -95,22 +111,28 @@ def update_my_profile(
             setattr(profile, key, value)
             
     elif current_user.role == "sitter":
-        profile_update_data = sitter_profile_data.model_dump(exclude_unset=True)
+        profile_update_data = sent_fields(sitter_profile_data)
+
+        crud.set_sitter_tags(
+            db, profile,
+            activities=profile_update_data.pop('activities', None),
+            regions=profile_update_data.pop('regions', None),
+            pay_periods=profile_update_data.pop('pay_period', None)
+        )
 
         for key, value in profile_update_data.items():
             if isinstance(value, list):
                 value = ", ".join(value)
-            
-            if key == "pay_period":
-                setattr(profile, "pay_periods", value)
-            elif key == "regions": 
-                setattr(profile, "regions", value)
-            else:
-                setattr(profile, key, value)
+            setattr(profile, key, value)
 
     db.commit()
-    current_user = db.merge(current_user)
     db.refresh(current_user)
+
+    if current_user.role == "sitter":
+        sitter_index.refresh_user(db, current_user.id)
+        invalidate_sitters()
+    elif current_user.role == "parent":
+        invalidate_survey(profile.id)
     
     rematch_prob = current_user.sitter_profile.rematch_probability if current_user.role == "sitter" and current_user.sitter_profile else None
 